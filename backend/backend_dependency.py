@@ -386,16 +386,33 @@
 #   app.run(host="0.0.0.0", port=5000, debug=True)
 import json
 import base64
+import os
 import zlib
 import warnings
 import re
 import math
+import time
+import uuid
+import itertools
 from pathlib import Path
 from typing import Dict, List, Tuple, Any
 
 import requests
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
+from werkzeug.wsgi import ClosingIterator
+
+import get_dependency_kc as kc_module # dependency engine with the improved _match_entity_by_prefix logic
+from crawl_jobs import CrawlJobs
+from etag_cache import ETagCache
+from feature_cache import FeatureCache
+from fixture_recorder import FixtureRecorder
+from memory_usage import rss_available
+from onshape_client import OnshapeClient
+from result_cache import ResultCache
+from result_encoding import ENCODINGS, EncodedResult
+from single_flight import SingleFlight
+from snapshot_store import SnapshotStore
 
 warnings.filterwarnings('ignore', message='urllib3 v2 only supports OpenSSL')
 
@@ -456,7 +473,41 @@ with open("APIKey.json") as f:
     API_ACCESS = data['access']
     API_SECRET = data['secret']
 
-BASE_URL = "cad.onshape.com" # TODO: update if accessing files in enterprise accounts 
+BASE_URL = os.environ.get("ONSHAPE_BASE_URL", "cad.onshape.com") # TODO: update if accessing files in enterprise accounts 
+
+# Optional memory ceiling of the server process for crawls of very large folders (see kc_module.get_dependency); 
+# the peak resident set size of every crawl is reported in its progress. The ceiling is process-wide, so it 
+# also covers the caches below and crawls running side by side. 
+CRAWL_MAX_MEMORY = int(os.environ["CRAWL_MAX_MEMORY_MB"]) * 2**20 if os.environ.get("CRAWL_MAX_MEMORY_MB") else None
+if CRAWL_MAX_MEMORY is not None and not rss_available(): 
+    warnings.warn("CRAWL_MAX_MEMORY_MB is ignored: the resident set size cannot be read on this platform (install psutil)")
+    CRAWL_MAX_MEMORY = None
+
+# One pooled client for the whole server, so TLS connections survive across requests. Under a memory 
+# ceiling its ETag store only keeps bodies up to a sixteenth of it: feature lists, the big bodies, are 
+# kept on disk by feature_cache anyway, and a full-size store could hold the process over the ceiling. 
+client = OnshapeClient(API_ACCESS, API_SECRET, etags=ETagCache(max_bytes=CRAWL_MAX_MEMORY // 16) if CRAWL_MAX_MEMORY else None)
+# Part studio feature lists keyed by microversion, shared across requests and restarts 
+feature_cache = FeatureCache(Path(__file__).resolve().parent / "feature_cache")
+# State of the last crawl of every input, so a refresh only rescans the part studios that changed; 
+# crawls of the same input take turns on its snapshot 
+dependency_snapshots = SnapshotStore(kc_module.DependencySnapshot)
+# Opt-in recording: if set, every request writes its Onshape responses and its output as fixtures 
+# into its own sub-folder of this directory, in the background. Nothing is recorded otherwise. 
+RECORD_FIXTURES_DIR = os.environ.get("RECORD_FIXTURES_DIR")
+# Whole results keyed by the request inputs and the source microversion, so repeated loads of 
+# the visualizer are served from memory. Downstream edits only show up once an entry expires. 
+result_cache = ResultCache(ttl=float(os.environ.get("RESULT_CACHE_TTL", 300)))
+# Concurrent requests for the same inputs share one crawl instead of starting their own 
+in_flight = SingleFlight()
+# Background crawls started through POST /jobs, for folders too big to crawl within one HTTP request 
+crawl_jobs = CrawlJobs(max_workers=int(os.environ.get("CRAWL_JOB_WORKERS", 2)))
+# Inputs used when the request does not give its own (the robot document) 
+DEFAULT_DID = '56e646580a50f305280bbafc'
+DEFAULT_WID = '5a99299fc7972f9cefe014a6'
+DEFAULT_EID = '482f1ae4627799170e6a9a4e'
+ID_PATTERN = re.compile(r"[0-9a-f]{24}") # Onshape document, workspace and element IDs 
+DEFAULT_SKETCHES = ['Drivebase Top', 'Drivebase Side', 'Substation', 'Arm', 'Hopper', 'Frame Side', 'Claw Sketch', 'Front Home Coral', 'Coral Grabber', 'Chain Plan', 'Tube Sketch']
 
 
 def get_folder(did: str) -> str: 
@@ -469,14 +520,7 @@ def get_folder(did: str) -> str:
         str: parent ID of the folder 
     """
     # https://cad.onshape.com/glassworks/explorer/#/Document/getDocument
-    response = requests.get(
-        "https://{}/api/documents/{}".format(BASE_URL, did), 
-        auth=(API_ACCESS, API_SECRET), 
-        headers={
-            "Accept": "application/json;charset=UTF-8; qs=0.09", 
-            "Content-Type": "application/json"
-        }
-    )
+    response = client.get(BASE_URL, "/api/documents/{}".format(did))
     if response.ok: 
         return response.json()['parentId']
     else: 
@@ -496,14 +540,7 @@ def get_docs_in_folder(folder_id: str) -> Tuple[List[str], List[str], List[str]]
             a list of corresponding document names. 
     """
     # Undocumented API endpoint -- expect unknown behaviours 
-    response = requests.get(
-        "https://{}/api/globaltreenodes/folder/{}".format(BASE_URL, folder_id), 
-        auth=(API_ACCESS, API_SECRET), 
-        headers={
-            "Accept": "application/json;charset=UTF-8; qs=0.09", 
-            "Content-Type": "application/json"
-        }
-    )
+    response = client.get(BASE_URL, "/api/globaltreenodes/folder/{}".format(folder_id))
     if not response.ok: 
         print(response.text)
         raise ValueError("API call failed")
@@ -530,21 +567,14 @@ def get_all_elements(did: str, wid: str) -> Tuple[List[str], List[str]]:
             a list of corresponding element names. 
     """
     # https://cad.onshape.com/glassworks/explorer/#/Document/getElementsInDocument 
-    response = requests.get(
-        "https://{}/api/documents/d/{}/w/{}/elements".format(BASE_URL, did, wid), 
-        auth=(API_ACCESS, API_SECRET), 
-        headers={
-            "Accept": "application/json;charset=UTF-8; qs=0.09", 
-            "Content-Type": "application/json"
-        }, 
+    response = client.get(
+        BASE_URL, "/api/documents/d/{}/w/{}/elements".format(did, wid), 
         params={
             'elementType': 'PARTSTUDIO' 
         }
     )
     if response.ok: 
         response = response.json() 
-        json.dump(response, open('test_elements.json', 'w'))
-
         eid_list = [ele['id'] for ele in response]
         eid_names = [ele['name'] for ele in response]
         return eid_list, eid_names
@@ -555,18 +585,10 @@ def get_all_elements(did: str, wid: str) -> Tuple[List[str], List[str]]:
 
 def get_ps_features(did: str, wid: str, eid: str) -> Any: 
     # https://cad.onshape.com/glassworks/explorer/#/PartStudio/getPartStudioFeatures
-    response = requests.get(
-        "https://{}/api/v12/partstudios/d/{}/w/{}/e/{}/features".format(
-            BASE_URL, did, wid, eid
-        ), # using v12 for simpler API response structure 
-        auth=(API_ACCESS, API_SECRET), 
-        headers={
-            "Accept": "application/json;charset=UTF-8; qs=0.09", 
-            "Content-Type": "application/json"
-        }
+    response = client.get(
+        BASE_URL, "/api/v12/partstudios/d/{}/w/{}/e/{}/features".format(did, wid, eid) # using v12 for simpler API response structure 
     )
     if response.ok: 
-        json.dump(response.json(), open('test_features.json', 'w'))
         return response.json() 
     else: 
         print(response.text)
@@ -819,20 +841,188 @@ def get_dependency(did: str, wid: str, eid: str, master_sketches: List[str]):
     
     return entities_geo, entities_dep, doc_info, mate_connectors
 
-# the endpoint - using get_dependency-KC.py for improved entity matching
+# the endpoint - using get_dependency_kc.py for improved entity matching
+def _result_response(result: EncodedResult) -> Response: 
+    """Send a result as plain JSON, or in the compact columnar format (see compact_result.py) if the 
+    request asks for format=compact, compressed with the best Content-Encoding the client accepts. 
+    The bodies are kept with the cached result, so a cache hit is sent without encoding it again. 
+    """
+    result_format = "compact" if request.args.get('format') == "compact" else "plain"
+    encoding = request.accept_encodings.best_match(ENCODINGS, default="identity")
+    response = Response(result.body(result_format, encoding), mimetype="application/json")
+    if encoding != "identity": 
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+class InputError(ValueError): 
+    """Invalid inputs of a request, answered with 400."""
+
+
+def _request_inputs() -> Tuple[str, str, str, List[str]]: 
+    """did, wid, eid and master sketch names of a request, from its query string or JSON body. 
+    The robot document is used for every input that is not given. Raises InputError if an ID is 
+    not an Onshape ID or `sketch` is not a non-empty list of names. 
+    """
+    body = request.get_json(silent=True) or {}
+    if not isinstance(body, dict): 
+        raise InputError("the JSON body must be an object")
+    ids = []
+    for name, default in (('did', DEFAULT_DID), ('wid', DEFAULT_WID), ('eid', DEFAULT_EID)): 
+        value = body.get(name) or request.args.get(name, default)
+        if not isinstance(value, str) or ID_PATTERN.fullmatch(value) is None: 
+            raise InputError("{} must be a 24 character hexadecimal Onshape ID".format(name))
+        ids.append(value)
+    master_sketches = body['sketch'] if 'sketch' in body else request.args.getlist('sketch') or DEFAULT_SKETCHES
+    if not isinstance(master_sketches, list) or not master_sketches or not all(isinstance(name, str) and name for name in master_sketches): 
+        raise InputError("sketch must be a non-empty list of master sketch names")
+    did, wid, eid = ids
+    return did, wid, eid, master_sketches
+
+
+@app.errorhandler(InputError)
+def input_error(e: InputError):
+    return jsonify({'error': str(e)}), 400
+
+
+@app.errorhandler(kc_module.SketchNotFoundError)
+@app.errorhandler(kc_module.ElementNotFoundError)
+def not_found(e: ValueError):
+    return jsonify({'error': str(e)}), 404
+
+
+@app.errorhandler(kc_module.OnshapeAPIError)
+def onshape_api_error(e: kc_module.OnshapeAPIError):
+    # a bad or inaccessible ID is the caller's to fix; anything else is Onshape failing us 
+    if e.status_code in (400, 403, 404): 
+        return jsonify({'error': "document, workspace or element not found or not accessible ({})".format(e.status_code)}), 404
+    return jsonify({'error': str(e)}), 502
+
+
+@app.errorhandler(requests.RequestException)
+def onshape_unreachable(e: requests.RequestException):
+    # raised once the client's retries are used up, e.g. Onshape unreachable or stalled 
+    return jsonify({'error': "Onshape request failed: {}: {}".format(type(e).__name__, e)}), 502
+
+
 @app.get("/get_dependency")
 def get_dependency_route():
-    # Import from get_dependency-KC.py which has the improved _match_entity_by_prefix logic
-    from importlib.machinery import SourceFileLoader
-    kc_module = SourceFileLoader("get_dependency_kc", "get_dependency-KC.py").load_module()
-    
-    entities_geo, entities_dep, doc_info, mate_connectors = kc_module.get_dependency(
-        '56e646580a50f305280bbafc', '5a99299fc7972f9cefe014a6', '482f1ae4627799170e6a9a4e', 
-        ['Drivebase Top', 'Drivebase Side', 'Substation', 'Arm', 'Hopper', 'Frame Side', 'Claw Sketch', 'Front Home Coral', 'Coral Grabber', 'Chain Plan', 'Tube Sketch']
-    )
-    results = [entities_geo, entities_dep, doc_info, mate_connectors]
-    json.dump(results, open('test_output_robot.json', 'w'), indent=2)
-    return jsonify(results)
+    """Query parameters (all optional, the robot document by default): did, wid, eid of the 
+    master part studio, and one `sketch` parameter per master sketch name. 
+
+    Returns [entities_geo, entities_dep, doc_info, mate_connectors, errors], where errors lists the 
+    documents and part studios that could not be loaded and are missing from the rest. 
+    """
+    # The engine is imported once at startup, so its client, caches and indexes stay warm across requests 
+    did, wid, eid, master_sketches = _request_inputs()
+
+    if RECORD_FIXTURES_DIR: 
+        # a recording request crawls everything on its own, so that its fixtures cover the whole folder 
+        recorder = FixtureRecorder(Path(RECORD_FIXTURES_DIR) / "{}-{}".format(time.strftime("%Y%m%d-%H%M%S"), uuid.uuid4().hex[:8]))
+        errors = [] 
+        results = list(kc_module.get_dependency(did, wid, eid, master_sketches, client=client.recording(recorder), errors=errors)) + [errors]
+        recorder.record("test_output", results)
+        return _result_response(EncodedResult(results))
+
+    # one cheap call to the elements endpoint instead of a whole folder crawl on a hit 
+    cache_key = (did, wid, eid, tuple(master_sketches), kc_module.get_element_microversion(did, wid, eid, client=client))
+    result = result_cache.get(cache_key)
+    if result is None: 
+        progress = kc_module.CrawlProgress() # left with the crawl, for jobs that join it 
+        result = in_flight.do(cache_key, lambda: _crawl(cache_key, master_sketches, progress), context=progress)
+    return _result_response(result)
+
+
+def _crawl(cache_key: Tuple, master_sketches: List[str], progress: kc_module.CrawlProgress) -> EncodedResult: 
+    result = result_cache.get(cache_key) # a crawl for the same key may have finished meanwhile 
+    if result is None: 
+        did, wid, eid = cache_key[:3]
+        errors = [] 
+        with dependency_snapshots.use(cache_key[:4]) as snapshot: 
+            result = EncodedResult(list(kc_module.get_dependency(
+                did, wid, eid, master_sketches, client=client, cache=feature_cache, snapshot=snapshot, 
+                progress=progress, errors=errors, max_memory=CRAWL_MAX_MEMORY
+            )) + [errors], progress=progress)
+        if not errors: # otherwise the next request retries the failed elements; the snapshot keeps the rest 
+            result_cache.put(cache_key, result)
+    elif result.progress is not None: 
+        progress.follow(result.progress) # final counters of the crawl that computed it 
+    return result
+
+
+@app.get("/get_dependency/stream")
+def stream_dependency_route():
+    """Same inputs as /get_dependency, but streams the crawl events of kc_module.iter_dependency as 
+    soon as they are known: as NDJSON (one event per line) by default, or as server-sent events 
+    if the client accepts text/event-stream or passes format=sse. 
+    The master sketches are read before the response starts, so a bad sketch name or a failed 
+    fetch of the source part studio answers with an error status like /get_dependency. A fatal 
+    error after that ends the stream with an "error" event that has `fatal` set and no "done". 
+    """
+    did, wid, eid, master_sketches = _request_inputs()
+    sse = request.args.get('format') == "sse" or request.accept_mimetypes.best == "text/event-stream"
+
+    def _line(event: Dict[str, Any]) -> str: 
+        line = json.dumps(event, separators=(",", ":"))
+        return "event: {}\ndata: {}\n\n".format(event['event'], line) if sse else line + "\n"
+
+    def _encode(): 
+        with dependency_snapshots.use((did, wid, eid, tuple(master_sketches))) as snapshot: 
+            events = kc_module.iter_dependency(did, wid, eid, master_sketches, client=client, cache=feature_cache, 
+                                               snapshot=snapshot, tolerate_errors=True, max_memory=CRAWL_MAX_MEMORY)
+            yield _line(next(events)) # the geometry event 
+            try: 
+                for event in events: 
+                    yield _line(event)
+            except kc_module.LOAD_ERRORS as e: 
+                # the 200 is already sent, so the client learns of the failure from a last event 
+                yield _line({'event': "error", 'fatal': True, 'did': did, 'wid': wid, 'eid': eid, 'name': None, 
+                             'error': "{}: {}".format(type(e).__name__, e)})
+
+    lines = _encode()
+    first = next(lines) # failures up to here go to the error handlers 
+    # no buffering by proxies, so every event reaches the browser right away 
+    return Response(ClosingIterator(itertools.chain([first], lines), lines.close), mimetype="text/event-stream" if sse else "application/x-ndjson", 
+                    headers={'Cache-Control': "no-cache", 'X-Accel-Buffering': "no"})
+
+
+@app.post("/jobs")
+def start_job_route():
+    """Start a crawl in the background and return its job ID right away (202). Takes the same 
+    inputs as /get_dependency, as query parameters or as a JSON body with a `sketch` list. 
+    Poll GET /jobs/<job_id> for its progress, then fetch GET /jobs/<job_id>/result. 
+    """
+    did, wid, eid, master_sketches = _request_inputs()
+
+    def _job_crawl(progress: kc_module.CrawlProgress) -> EncodedResult: 
+        cache_key = (did, wid, eid, tuple(master_sketches), kc_module.get_element_microversion(did, wid, eid, client=client))
+        # shares a crawl already running for the same key, and then reports that crawl's progress 
+        return in_flight.do(cache_key, lambda: _crawl(cache_key, master_sketches, progress), 
+                            context=progress, on_join=progress.follow)
+
+    job = crawl_jobs.submit((did, wid, eid, tuple(master_sketches)), _job_crawl)
+    return jsonify(job.as_dict()), 202, {'Location': "/jobs/{}".format(job.id)}
+
+
+@app.get("/jobs/<job_id>")
+def job_status_route(job_id: str):
+    job = crawl_jobs.get(job_id)
+    if job is None: 
+        return jsonify({'error': "unknown job {}".format(job_id)}), 404
+    return jsonify(job.as_dict())
+
+
+@app.get("/jobs/<job_id>/result")
+def job_result_route(job_id: str):
+    job = crawl_jobs.get(job_id)
+    if job is None: 
+        return jsonify({'error': "unknown job {}".format(job_id)}), 404
+    if job.status == "failed": 
+        return jsonify(job.as_dict()), 500
+    if job.status != "done": 
+        return jsonify(job.as_dict()), 202 # not ready yet, keep polling 
+    return _result_response(job.result)
 
 
 
@@ -0,0 +1,244 @@
+"""Offline benchmarks for the dependency engine in get_dependency_kc.py.
+
+The checked-in fixtures (see replay_fixtures.py) are replayed through a fake transport mounted
+on an OnshapeClient, so the whole pipeline runs without Onshape access or an API key.
+Results are printed (or written) as JSON to track regressions between releases:
+
+    python bench_dependency.py --scale 1000 5000 --output bench.json
+"""
+import argparse
+import copy
+import json
+import time
+import timeit
+from typing import Any, Dict, List
+
+import requests
+from requests.adapters import BaseAdapter
+
+import get_dependency_kc as kc_module
+from onshape_client import OnshapeClient
+from replay_fixtures import ReplayFolder, load_fixture, recorded_folder, synthetic_folder
+
+
+# ---------- Fake transport ----------
+class FakeTransport(BaseAdapter):
+    """requests transport adapter answering the Onshape endpoints used by the engine from a ReplayFolder.
+
+    Args:
+        folder (ReplayFolder): recorded folder to serve.
+        latency (float): seconds to sleep before answering each request, to mimic the network.
+    """
+
+    def __init__(self, folder: ReplayFolder, latency: float = 0.0):
+        super().__init__()
+        self.folder = folder
+        self.latency = latency
+        self.calls = 0
+
+    def send(self, request, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        url = requests.utils.urlparse(request.url)
+        query = dict(pair.split("=", 1) for pair in url.query.split("&") if pair)
+        response = requests.Response()
+        response.request, response.url = request, request.url
+        try:
+            payload = self.folder.payload(url.path, query)
+            response.status_code = 200
+            response._content = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        except KeyError:
+            response.status_code = 404
+            response._content = b'{"message": "not found"}'
+        response.headers["Content-Type"] = "application/json;charset=UTF-8"
+        response.encoding = "utf-8"
+        return response
+
+    def close(self):
+        pass
+
+
+# ---------- Benchmarks ----------
+def _best_of(fn, number: int, repeat: int = 3) -> float:
+    """Best average seconds per call over a few repeats."""
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+
+def bench_parsers(folder: ReplayFolder, number: int = 20) -> Dict[str, Any]:
+    """Time the pure-Python parsing helpers on one source and one downstream part studio."""
+    source = json.loads(folder.features[folder.eid])
+    # _get_sketch_entities annotates the geometry in place, so every call gets its own copy of the
+    # source, parsed and copied outside the timer so that only the extraction is measured
+    sources = iter([copy.deepcopy(source) for _ in range(number * 3)]) # 3 repeats of _best_of
+    downstream_eid = next(ele_id for ele_id in folder.features if ele_id != folder.eid)
+    downstream = json.loads(folder.features[downstream_eid])['features']
+    sketch_ids = [kc_module._get_sketch_entities(source, name)[0] for name in folder.master_sketches]
+    scanned = [feature for feature in downstream if feature['btType'] == "BTMFeature-134"]
+    derived = [feature for feature in downstream if feature['featureType'] == "importDerived"]
+    starts = kc_module._starts_at_derived_master_sketches(folder.did, folder.eid, sketch_ids)
+
+    def _sketch_entities():
+        source_copy = next(sources)
+        return [kc_module._get_sketch_entities(source_copy, name) for name in folder.master_sketches]
+
+    def _search():
+        kc_module._decode_query.cache_clear() # time the cold path, like the first crawl after a restart
+        for feature in scanned:
+            kc_module._search_ref_entities(feature['parameters'], sketch_ids)
+
+    return {
+        '_get_sketch_entities_s': _best_of(_sketch_entities, number),
+        '_search_ref_entities_s': _best_of(_search, number),
+        '_is_derived_master_sketch_s': _best_of(
+            lambda: [kc_module._is_derived_master_sketch(feature['parameters'], folder.did, folder.eid, sketch_ids) for feature in derived], number),
+        '_extract_mate_connectors_s': _best_of(lambda: kc_module._extract_mate_connectors({'features': downstream}), number),
+        '_scan_features_s': _best_of(lambda: list(kc_module._scan_features(downstream, sketch_ids, starts)), number),
+        'features_scanned': len(scanned),
+    }
+
+
+def bench_get_dependency(folder: ReplayFolder, max_workers: int = kc_module.DEFAULT_MAX_WORKERS,
+                         latency: float = 0.0, number: int = 3, max_memory: int = None) -> Dict[str, Any]:
+    """Time a whole get_dependency crawl of the folder through the fake transport."""
+    transport = FakeTransport(folder, latency=latency)
+    client = OnshapeClient("offline", "offline", transport=transport)
+    progress = kc_module.CrawlProgress()
+
+    def _crawl():
+        return kc_module.get_dependency(folder.did, folder.wid, folder.eid, folder.master_sketches,
+                                        max_workers=max_workers, client=client, progress=progress, max_memory=max_memory)
+
+    entities_dep = _crawl()[1]
+    transport.calls = 0
+    seconds = _best_of(_crawl, number, repeat=1)
+    return {
+        'documents': len(folder.docs),
+        'part_studios': len(folder.features),
+        'features': folder.n_features,
+        'edges': sum(len(deps) for deps in entities_dep.values()),
+        'max_workers': max_workers,
+        'latency_s': latency,
+        'api_calls': transport.calls // number,
+        'get_dependency_s': seconds,
+        'max_memory_mb': max_memory / 2**20 if max_memory is not None else None,
+        'peak_rss_mb': progress.peak_rss / 2**20, # of the whole benchmark process so far
+    }
+
+
+def _match_entity_by_prefix_linear(entity_base: str, entities_dep: Dict[str, List]) -> List[str]:
+    """The previous linear scan over every entityId, kept as the baseline."""
+    matches = []
+    for full_entity_id in entities_dep:
+        if full_entity_id == entity_base or full_entity_id.startswith(entity_base + "."):
+            matches.append(full_entity_id)
+    return matches
+
+
+def _robot_inputs():
+    """entities_dep of the robot folder and the candidate bases found in the Claw part studio."""
+    entities_geo = load_fixture("test_output_robot.json")[0]
+    entities_dep = {key: [] for geo_dict in entities_geo for key in geo_dict}
+    sketch_ids = list({geo['featureId'] for geo_dict in entities_geo for geo in geo_dict.values()})
+    features = load_fixture("test_features.json")['features']
+    entity_bases = []
+    for feature in features:
+        if feature['btType'] == "BTMFeature-134":
+            entity_bases.extend(kc_module._search_ref_entities(feature['parameters'], sketch_ids))
+    return entities_dep, entity_bases
+
+
+def bench_prefix_match(number: int = 200) -> Dict[str, float]:
+    """Compare the linear prefix scan with the prefix index on robot-sized inputs."""
+    entities_dep, entity_bases = _robot_inputs()
+    prefix_index = kc_module._build_prefix_index(entities_dep)
+    for entity_base in entity_bases: # both must agree before timing anything
+        assert _match_entity_by_prefix_linear(entity_base, entities_dep) == kc_module._match_entity_by_prefix(entity_base, prefix_index)
+
+    def _linear():
+        return [_match_entity_by_prefix_linear(entity_base, entities_dep) for entity_base in entity_bases]
+
+    def _indexed():
+        index = kc_module._build_prefix_index(entities_dep) # built once per run in get_dependency
+        return [kc_module._match_entity_by_prefix(entity_base, index) for entity_base in entity_bases]
+
+    linear = timeit.timeit(_linear, number=number) / number
+    indexed = timeit.timeit(_indexed, number=number) / number
+    return {
+        'entities': len(entities_dep),
+        'references': len(entity_bases),
+        'linear_s': linear,
+        'indexed_s': indexed, # includes building the index once
+        'speedup': linear / indexed,
+    }
+
+
+def _search_ref_entities_linear(api_params: List[Any], sketch_ids: List[str]) -> List[str]:
+    """The previous search, scanning each decoded query once per master sketch, kept as the baseline."""
+    ref_entity_bases = []
+    for param in api_params:
+        if param['btType'] == "BTMParameterArray-2025":
+            sub_params = [item['parameters'] for item in param['items']]
+            ref_entity_bases.extend(_search_ref_entities_linear([item for sublist in sub_params for item in sublist], sketch_ids))
+        elif param['btType'] == "BTMParameterQueryList-148":
+            for query in param['queries']:
+                decoded = kc_module._decode_query(query['queryString'])
+                if decoded is not None:
+                    q_string, _, entity_bases = decoded
+                    for sketch_id in sketch_ids:
+                        if sketch_id in q_string:
+                            ref_entity_bases.extend(entity_bases)
+                            break
+    return list(set(ref_entity_bases))
+
+
+def bench_sketch_match(number: int = 200) -> Dict[str, float]:
+    """Compare the per-sketch substring scans with the compiled sketch matcher on test_features.json.
+
+    Decoded queries are cached in both, so this times the matching alone, as on every crawl after the first.
+    """
+    features = [feature['parameters'] for feature in load_fixture("test_features.json")['features']]
+    sketch_ids = list({geo['featureId'] for geo_dict in load_fixture("test_output_robot.json")[0] for geo in geo_dict.values()})
+    for api_params in features: # both must agree before timing anything
+        assert sorted(_search_ref_entities_linear(api_params, sketch_ids)) == sorted(kc_module._search_ref_entities(api_params, sketch_ids))
+
+    linear = timeit.timeit(lambda: [_search_ref_entities_linear(api_params, sketch_ids) for api_params in features], number=number) / number
+    compiled = timeit.timeit(lambda: [kc_module._search_ref_entities(api_params, sketch_ids) for api_params in features], number=number) / number
+    return {
+        'master_sketches': len(sketch_ids),
+        'features': len(features),
+        'linear_s': linear,
+        'compiled_s': compiled,
+        'speedup': linear / compiled,
+    }
+
+
+def run(scales: List[int], max_workers: int, latency: float, max_memory: int = None) -> Dict[str, Any]:
+    results = {'prefix_match': bench_prefix_match(), 'sketch_match': bench_sketch_match(), 'fixtures': {}, 'synthetic': {}}
+    for output_name in ("test_output_robot.json", "test_output_spray.json"):
+        folder = recorded_folder(output_name)
+        results['fixtures'][output_name] = {
+            'parsers': bench_parsers(folder),
+            'get_dependency': bench_get_dependency(folder, max_workers, latency, max_memory=max_memory),
+        }
+    for n_features in scales:
+        results['synthetic'][str(n_features)] = bench_get_dependency(synthetic_folder(n_features), max_workers, latency, number=1,
+                                                                     max_memory=max_memory)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, nargs="*", default=[1000, 5000], help="feature counts of the synthetic folders")
+    parser.add_argument("--workers", type=int, default=kc_module.DEFAULT_MAX_WORKERS, help="max_workers of get_dependency")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated seconds per API call")
+    parser.add_argument("--max-memory", type=int, help="memory ceiling of the crawls in MB (see get_dependency)")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    results = run(args.scale, args.workers, args.latency, args.max_memory * 2**20 if args.max_memory else None)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
@@ -0,0 +1,150 @@
+"""Compact columnar encoding of get_dependency results.
+
+The plain result repeats full ID strings for every dependency edge and writes every float as
+decimal text. The compact encoding ("compact-v1") interns every string once in a table, stores
+the edges as integer arrays into a table of unique dependent features, and packs the sketch
+geometry into little-endian float64 arrays (base64). doc_info, mate_connectors and any further
+parts of the result (e.g. errors) are small and kept as they are.
+
+    {
+        'format': "compact-v1",
+        'strings': [str, ...],
+        'schemas': [[[key, kind], ...], ...], # key layouts of the geometry dicts; kind: "n" number, "b" bool, "s" string, "j" other JSON
+        'sketches': [{'ids': [int], 'schemas': [int], 'numbers': base64 float64[], 'bools': [0|1],
+                      'strings': [int], 'json': [Any]}, ...],
+        'features': [int, ...], # 4 string indices (did, wid, eid, fid) per unique dependent feature
+        'dep': {'ids': [int], 'counts': [int], 'refs': [int]}, # refs index features, counts[i] per entity
+        'rest': [doc_info, mate_connectors, ...],
+    }
+
+decode_compact rebuilds the plain result; frontend/deal_data.js has the same decoder.
+"""
+import base64
+import sys
+from array import array
+from typing import Any, Dict, List
+
+FORMAT = "compact-v1"
+
+
+class _Interner:
+    def __init__(self):
+        self.table = []
+        self._index = {}
+
+    def __call__(self, value: str) -> int:
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.table)
+            self.table.append(value)
+        return index
+
+
+def _kind(value: Any) -> str:
+    if isinstance(value, bool):
+        return "b"
+    if isinstance(value, (int, float)):
+        return "n"
+    if isinstance(value, str):
+        return "s"
+    return "j"
+
+
+def _pack_floats(values: List[float]) -> str:
+    packed = array("d", values)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return base64.b64encode(packed.tobytes()).decode("ascii")
+
+
+def _unpack_floats(data: str) -> List[float]:
+    packed = array("d")
+    packed.frombytes(base64.b64decode(data))
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tolist()
+
+
+def encode_compact(results: List[Any]) -> Dict[str, Any]:
+    """Encode [entities_geo, entities_dep, doc_info, mate_connectors, ...] in the compact format."""
+    entities_geo, entities_dep = results[0], results[1]
+    intern = _Interner()
+    schemas, schema_index = [], {}
+
+    sketches = []
+    for geo_dict in entities_geo:
+        sketch = {'ids': [], 'schemas': [], 'numbers': [], 'bools': [], 'strings': [], 'json': []}
+        for entity_id, geo in geo_dict.items():
+            signature = tuple((key, _kind(value)) for key, value in geo.items())
+            if signature not in schema_index:
+                schema_index[signature] = len(schemas)
+                schemas.append([[key, kind] for key, kind in signature])
+            sketch['ids'].append(intern(entity_id))
+            sketch['schemas'].append(schema_index[signature])
+            for key, kind in signature:
+                value = geo[key]
+                if kind == "n":
+                    sketch['numbers'].append(value)
+                elif kind == "b":
+                    sketch['bools'].append(int(value))
+                elif kind == "s":
+                    sketch['strings'].append(intern(value))
+                else:
+                    sketch['json'].append(value)
+        sketch['numbers'] = _pack_floats(sketch['numbers'])
+        sketches.append(sketch)
+
+    features, feature_index = [], {}
+    dep = {'ids': [], 'counts': [], 'refs': []}
+    for entity_id, dep_features in entities_dep.items():
+        dep['ids'].append(intern(entity_id))
+        dep['counts'].append(len(dep_features))
+        for dep_feature in dep_features:
+            key = tuple(dep_feature)
+            if key not in feature_index:
+                feature_index[key] = len(feature_index)
+                features.extend(intern(part) for part in key)
+            dep['refs'].append(feature_index[key])
+
+    return {
+        'format': FORMAT,
+        'strings': intern.table,
+        'schemas': schemas,
+        'sketches': sketches,
+        'features': features,
+        'dep': dep,
+        'rest': list(results[2:]),
+    }
+
+
+def decode_compact(compact: Dict[str, Any]) -> List[Any]:
+    """Rebuild the plain result list from encode_compact output."""
+    if compact.get('format') != FORMAT:
+        raise ValueError("unknown result format {!r}".format(compact.get('format')))
+    strings, schemas = compact['strings'], compact['schemas']
+
+    entities_geo = []
+    for sketch in compact['sketches']:
+        numbers, bools, texts, others = iter(_unpack_floats(sketch['numbers'])), iter(sketch['bools']), iter(sketch['strings']), iter(sketch['json'])
+        geo_dict = {}
+        for entity_index, schema in zip(sketch['ids'], sketch['schemas']):
+            geo = {}
+            for key, kind in schemas[schema]:
+                if kind == "n":
+                    geo[key] = next(numbers)
+                elif kind == "b":
+                    geo[key] = bool(next(bools))
+                elif kind == "s":
+                    geo[key] = strings[next(texts)]
+                else:
+                    geo[key] = next(others)
+            geo_dict[strings[entity_index]] = geo
+        entities_geo.append(geo_dict)
+
+    features = compact['features']
+    dep_features = [[strings[index] for index in features[i:i + 4]] for i in range(0, len(features), 4)]
+    entities_dep, refs = {}, iter(compact['dep']['refs'])
+    for entity_index, count in zip(compact['dep']['ids'], compact['dep']['counts']):
+        entities_dep[strings[entity_index]] = [dep_features[next(refs)] for _ in range(count)]
+
+    return [entities_geo, entities_dep] + compact['rest']
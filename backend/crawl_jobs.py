@@ -0,0 +1,105 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from get_dependency_kc import CrawlProgress
+
+
+DEFAULT_MAX_JOBS = 2 # crawls running at the same time; each one runs its own pool of API calls
+DEFAULT_KEEP_FINISHED = 32 # finished jobs kept for their results to be fetched
+
+
+class CrawlJob:
+    """A dependency crawl running in the background.
+
+    Attributes:
+        id (str): job ID given to the client.
+        key (Hashable): inputs of the crawl; a new job for the same key reuses this one while it is unfinished.
+        status (str): "queued", "running", "done" or "failed".
+        progress (CrawlProgress): counters updated by the crawl.
+        result (Any): result of the crawl once done.
+        error (str): error message once failed.
+    """
+
+    def __init__(self, key: Hashable):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.status = "queued"
+        self.progress = CrawlProgress()
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Status and progress of the job, without its result."""
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'progress': self.progress.as_dict(),
+            'error': self.error,
+            'elapsed_s': (self.finished or time.time()) - self.created,
+        }
+
+
+class CrawlJobs:
+    """Runs crawls as jobs on a bounded pool of background workers.
+
+    Submitting a key that already has an unfinished job returns that job, so a burst of
+    identical requests only crawls once. Only the most recent finished jobs are kept.
+
+    Args:
+        max_workers (int): maximum number of crawls running at the same time; others wait queued.
+        keep_finished (int): number of finished jobs kept before the oldest are forgotten.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_JOBS, keep_finished: int = DEFAULT_KEEP_FINISHED):
+        self.keep_finished = keep_finished
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crawl-job")
+        self._lock = threading.Lock()
+        self._jobs = {} # Dict[job_id: CrawlJob]
+        self._active = {} # Dict[key: CrawlJob], unfinished jobs only
+        self._finished = OrderedDict() # Dict[job_id: None], oldest first
+
+    def submit(self, key: Hashable, crawl: Callable[[CrawlProgress], Any]) -> CrawlJob:
+        """Start crawl(progress) in the background, unless a job for key is still unfinished.
+
+        Args:
+            key (Hashable): inputs of the crawl.
+            crawl (Callable[[CrawlProgress], Any]): computes the result and updates the given progress.
+
+        Returns:
+            CrawlJob: the new job, or the unfinished one for the same key.
+        """
+        with self._lock:
+            job = self._active.get(key)
+            if job is not None:
+                return job
+            job = CrawlJob(key)
+            self._jobs[job.id] = job
+            self._active[key] = job
+        self._pool.submit(self._run, job, crawl)
+        return job
+
+    def get(self, job_id: str) -> Optional[CrawlJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: CrawlJob, crawl: Callable[[CrawlProgress], Any]):
+        job.status = "running"
+        try:
+            job.result = crawl(job.progress)
+            job.status = "done"
+        except Exception as e:
+            job.error = "{}: {}".format(type(e).__name__, e)
+            job.status = "failed"
+        job.finished = time.time()
+        with self._lock:
+            del self._active[job.key]
+            self._finished[job.id] = None
+            while len(self._finished) > self.keep_finished:
+                old_id, _ = self._finished.popitem(last=False)
+                del self._jobs[old_id]
@@ -0,0 +1,79 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import requests
+
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024 # response bodies kept in memory before evicting
+
+
+class ETagCache:
+    """In-memory store of response validators and bodies, for conditional GET requests.
+
+    For every URL answered with an ETag or a Last-Modified header, the body is kept together
+    with those validators. The next request for the URL sends them back (If-None-Match /
+    If-Modified-Since), and a 304 answer is served from the stored body. The least recently
+    used bodies are evicted beyond max_bytes. Safe to share between threads.
+
+    Args:
+        max_bytes (int): maximum total size of the stored bodies.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.not_modified = 0 # 304 answers served from the store
+        self._lock = threading.Lock()
+        self._entries = OrderedDict() # Dict[url: (validators, content, headers)], least recently used first
+        self._size = 0
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """Conditional headers to send for url; empty if nothing is stored for it."""
+        with self._lock:
+            entry = self._entries.get(url)
+            return dict(entry[0]) if entry is not None else {}
+
+    def store(self, url: str, response: requests.Response):
+        """Keep the body of a successful response if it carries validators."""
+        validators = {}
+        if response.headers.get("ETag"):
+            validators["If-None-Match"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = response.headers["Last-Modified"]
+        if not validators or len(response.content) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(url, None)
+            if old is not None:
+                self._size -= len(old[1])
+            self._entries[url] = (validators, response.content, dict(response.headers))
+            self._size += len(response.content)
+            while self._size > self.max_bytes:
+                _, (_, content, _) = self._entries.popitem(last=False)
+                self._size -= len(content)
+
+    def revalidated(self, url: str, response: requests.Response) -> Optional[requests.Response]:
+        """Turn a 304 answer into a 200 response with the stored body, or None if the body was evicted meanwhile."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            self._entries.move_to_end(url)
+            self.not_modified += 1
+        _, content, headers = entry
+        cached = requests.Response()
+        cached.status_code = 200
+        cached._content = content
+        cached.headers.update(headers)
+        cached.headers.update(response.headers) # fresher validators and dates, per RFC 9111
+        cached.url, cached.request, cached.encoding = response.url, response.request, response.encoding
+        return cached
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._size, 'not_modified': self.not_modified}
+
+
+def request_url(url: str, params=None) -> str:
+    """Full URL requests would send for url and params, used as the cache key."""
+    return requests.Request("GET", url, params=params).prepare().url
@@ -0,0 +1,93 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024 # compressed bytes kept on disk before evicting
+
+
+class FeatureCache:
+    """Persistent on-disk cache of part studio feature lists.
+
+    Entries are keyed by (did, wid, eid, microversion), followed by the kept feature fields
+    for a trimmed list, so an entry never goes stale: any edit to the element moves its
+    microversion and misses the cache. Every entry
+    is stored as a gzip-compressed JSON file, and the least recently used entries are
+    evicted once the total size on disk exceeds max_bytes. Recency is kept in the file
+    mtimes, so the LRU order survives restarts. Safe to share between threads.
+
+    Args:
+        directory (str | Path): folder to keep the cache files in; created if missing.
+        max_bytes (int): maximum total size of the compressed entries on disk.
+    """
+
+    def __init__(self, directory, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict() # Dict[filename: size], least recently used first
+        self._size = 0
+        files = sorted(self.directory.glob("*.json.gz"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            self._entries[path.name] = path.stat().st_size
+            self._size += self._entries[path.name]
+        with self._lock:
+            self._evict()
+
+    @staticmethod
+    def _filename(key: Tuple[str, ...]) -> str:
+        return hashlib.sha1("/".join(key).encode("utf-8")).hexdigest() + ".json.gz"
+
+    def get(self, key: Tuple[str, ...]) -> Optional[Any]:
+        """Get the cached feature list for (did, wid, eid, microversion[, fields...]), or None on a miss."""
+        name = self._filename(key)
+        with self._lock:
+            if name not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(name)
+        path = self.directory / name
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                payload = json.load(f)
+            os.utime(path) # mark as recently used
+        except (OSError, ValueError): # removed or corrupted underneath us
+            with self._lock:
+                self._size -= self._entries.pop(name, 0)
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return payload
+
+    def put(self, key: Tuple[str, ...], payload: Any):
+        """Store the feature list for (did, wid, eid, microversion[, fields...]), evicting old entries if needed."""
+        name = self._filename(key)
+        path = self.directory / name
+        tmp_path = path.with_name("{}.{}.tmp".format(name, threading.get_ident()))
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp_path, path) # atomic, so readers never see a partial entry
+        size = path.stat().st_size
+        with self._lock:
+            self._size += size - self._entries.pop(name, 0)
+            self._entries[name] = size
+            self._evict()
+
+    def _evict(self):
+        # caller holds self._lock
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            name, size = self._entries.popitem(last=False)
+            self._size -= size
+            try:
+                os.remove(self.directory / name)
+            except OSError:
+                pass
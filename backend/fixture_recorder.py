@@ -0,0 +1,57 @@
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, List
+
+# A single background writer shared by all recorders, so recording never blocks a request
+_WRITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fixture-recorder")
+
+
+def _write(path: Path, data: Any):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(data, bytes): # raw response body, written as received
+        path.write_bytes(data)
+    else:
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+
+class FixtureRecorder:
+    """Records Onshape responses and results of one request as JSON fixtures.
+
+    Every fixture is written asynchronously by a background thread into the recorder's own
+    directory, so concurrent requests never race on the same file names.
+
+    Args:
+        directory (str | Path): folder of this request's fixtures; created on the first write.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self._pending = [] # List[Future]
+        self._lock = threading.Lock()
+
+    def record(self, name: str, data: Any) -> Future:
+        """Queue a fixture for writing to {directory}/{name}.json.
+
+        Args:
+            name (str): file name of the fixture, without extension.
+            data (Any): raw response body (bytes) or a JSON-serializable object.
+
+        Returns:
+            Future: completes once the fixture is on disk.
+        """
+        future = _WRITER.submit(_write, self.directory / "{}.json".format(name), data)
+        with self._lock:
+            self._pending = [pending for pending in self._pending if not pending.done()]
+            self._pending.append(future)
+        return future
+
+    def flush(self) -> List[Path]:
+        """Wait until every queued fixture of this recorder is written, and list them."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+        return sorted(self.directory.glob("*.json"))
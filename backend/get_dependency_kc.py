@@ -0,0 +1,1101 @@
+import json 
+import base64
+import os
+import threading
+import zlib 
+import warnings
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Pattern, Tuple, Any
+from pathlib import Path
+
+import requests
+try: # optional, several times faster than the json module on feature lists
+    import orjson
+except ImportError:
+    orjson = None
+
+from feature_cache import FeatureCache
+from memory_usage import current_rss, rss_available
+from onshape_client import OnshapeClient
+
+import re
+import math
+
+# Suppress urllib3 OpenSSL/LibreSSL compatibility warning
+warnings.filterwarnings('ignore', message='urllib3 v2 only supports OpenSSL') 
+
+
+def _parse_qty(param):
+    """Return numeric value from a BTMParameterQuantity-147 param (in or deg)."""
+    if param.get("value") is not None:
+        return float(param["value"])
+    expr = (param.get("expression") or "").lower()
+    expr = expr.replace("in", "").replace("deg", "")
+    expr = re.sub(r"[^0-9+.\-*/() ]", "", expr)
+    try:
+        return float(eval(expr))
+    except Exception:
+        return 0.0
+
+
+def _parse_enum(param):
+    return param.get("value") or ""
+
+
+def _extract_mate_connectors(api_response):
+    """Returns {featureId: [{name, translation:[x,y,z], rotationType, rotationDeg, originQuery}]}."""
+    out = {}
+    for feat in api_response.get("features", []):
+        f_id = feat.get("featureId")
+        subfs = feat.get("subFeatures") or []
+        connectors = []
+        for sub in subfs:
+            if (sub.get("featureType") or "").lower() != "mateconnector" and sub.get("name") != "Mate connector":
+                continue
+            params = sub.get("parameters", [])
+            t = {"translationX": 0.0, "translationY": 0.0, "translationZ": 0.0,
+                 "rotationType": "", "rotationDeg": 0.0, "originQuery": None, "name": sub.get("name")}
+            for p in params:
+                pid = p.get("parameterId") or ""
+                if pid == "translationX":
+                    t["translationX"] = _parse_qty(p)
+                elif pid == "translationY":
+                    t["translationY"] = _parse_qty(p)
+                elif pid == "translationZ":
+                    t["translationZ"] = _parse_qty(p)
+                elif pid == "rotationType":
+                    t["rotationType"] = _parse_enum(p)
+                elif pid == "rotation":
+                    t["rotationDeg"] = _parse_qty(p)
+                elif pid in ("originQuery", "originQuery1", "query") and p.get("queries"):
+                    t["originQuery"] = p["queries"][0].get("queryString")
+            connectors.append(t)
+        if connectors:
+            out[f_id] = connectors
+    return out
+
+
+if Path("APIKey.json").exists(): 
+    with open("APIKey.json") as f: 
+        data = json.load(f)
+        API_ACCESS = data['access']
+        API_SECRET = data['secret']
+else: # offline use, e.g. benchmarks replaying fixtures through a fake transport 
+    warnings.warn("APIKey.json not found; calls to Onshape through the default client will be rejected")
+    API_ACCESS, API_SECRET = None, None
+
+BASE_URL = os.environ.get("ONSHAPE_BASE_URL", "cad.onshape.com") # TODO: update if accessing files in enterprise accounts 
+DEFAULT_MAX_WORKERS = 8 # concurrent Onshape requests per get_dependency call 
+QUERY_CACHE_SIZE = 4096 # decoded query strings kept in memory 
+SCAN_FIELDS = ("btType", "featureType", "featureId", "name", "parameters") # all the dependency scan reads of a downstream feature 
+
+CLIENT = OnshapeClient(API_ACCESS, API_SECRET) # shared by all fetchers unless another client is given 
+
+
+class OnshapeAPIError(ValueError): 
+    """An Onshape API call answered with an error status. 
+
+    Args:
+        status_code (int): HTTP status of the response. 
+    """
+
+    def __init__(self, status_code: int): 
+        super().__init__("API call failed ({})".format(status_code))
+        self.status_code = status_code
+
+
+class SketchNotFoundError(ValueError): 
+    """A master sketch name is not a feature of the source part studio.""" 
+
+
+class ElementNotFoundError(ValueError): 
+    """An element ID is not an element of the workspace.""" 
+
+
+def get_folder(did: str, client: OnshapeClient = None) -> str: 
+    """Get the parent ID of the folder that the document belongs to. 
+
+    Args:
+        did (str): document ID. 
+        client (OnshapeClient, optional): HTTP client to use; defaults to CLIENT. 
+
+    Returns:
+        str: parent ID of the folder 
+    """
+    # https://cad.onshape.com/glassworks/explorer/#/Document/getDocument
+    response = (client or CLIENT).get(BASE_URL, "/api/documents/{}".format(did))
+    if response.ok: 
+        return response.json()['parentId']
+    else: 
+        print(response.text)
+        raise OnshapeAPIError(response.status_code)
+    
+
+def get_docs_in_folder(folder_id: str, client: OnshapeClient = None) -> Tuple[List[str], List[str], List[str]]: 
+    """Get all documents within a folder. 
+
+    Args:
+        folder_id (str): parent ID of the folder. 
+        client (OnshapeClient, optional): HTTP client to use; defaults to CLIENT. 
+
+    Returns:
+        Tuple[List[str], List[str], List[str]]: a list of document IDs in the folder, 
+            a list of corresponding workspace IDs for the main branch, and 
+            a list of corresponding document names. 
+    """
+    # Undocumented API endpoint -- expect unknown behaviours 
+    response = (client or CLIENT).get(BASE_URL, "/api/globaltreenodes/folder/{}".format(folder_id))
+    if not response.ok: 
+        print(response.text)
+        raise OnshapeAPIError(response.status_code)
+    
+    response = response.json() 
+    did_list, wid_list, doc_name = [], [], [] 
+    for item in response['items']: 
+        if item['resourceType'] == 'document': # does not consider other file types or sub-folders 
+            did_list.append(item['id'])
+            wid_list.append(item['defaultWorkspace']['id'])
+            doc_name.append(item['name'])
+    return did_list, wid_list, doc_name 
+
+
+def get_all_elements(did: str, wid: str, client: OnshapeClient = None) -> Tuple[List[str], List[str], List[str]]: 
+    """Get all elements in a document. 
+
+    Args:
+        did (str): document ID. 
+        wid (str): workspace (branch) ID. 
+        client (OnshapeClient, optional): HTTP client to use; defaults to CLIENT. 
+
+    Returns:
+        Tuple[List[str], List[str], List[str]]: a list of element IDs (eid), 
+            a list of corresponding element names, and 
+            a list of corresponding element microversion IDs. 
+    """
+    # https://cad.onshape.com/glassworks/explorer/#/Document/getElementsInDocument 
+    response = (client or CLIENT).get(
+        BASE_URL, "/api/documents/d/{}/w/{}/elements".format(did, wid), 
+        params={
+            'elementType': 'PARTSTUDIO' 
+        }
+    )
+    if response.ok: 
+        response = response.json() 
+        eid_list = [ele['id'] for ele in response]
+        eid_names = [ele['name'] for ele in response]
+        eid_microversions = [ele['microversionId'] for ele in response]
+        return eid_list, eid_names, eid_microversions
+    else: 
+        print(response.text)
+        raise OnshapeAPIError(response.status_code)
+
+
+def get_element_microversion(did: str, wid: str, eid: str, client: OnshapeClient = None) -> str: 
+    """Get the current microversion of a single element. This is much cheaper 
+    than downloading the element's features. 
+
+    Args:
+        did (str): document ID. 
+        wid (str): workspace (branch) ID. 
+        eid (str): element ID. 
+        client (OnshapeClient, optional): HTTP client to use; defaults to CLIENT. 
+
+    Returns:
+        str: microversion ID of the element. 
+
+    Raises:
+        ElementNotFoundError: if the workspace has no element eid. 
+    """
+    # https://cad.onshape.com/glassworks/explorer/#/Document/getElementsInDocument 
+    response = (client or CLIENT).get(
+        BASE_URL, "/api/documents/d/{}/w/{}/elements".format(did, wid), 
+        params={
+            'elementId': eid 
+        }
+    )
+    if response.ok: 
+        elements = response.json()
+        if not elements: # a well-formed ID of no element in this workspace 
+            raise ElementNotFoundError("Element {} not found in workspace {} of document {}".format(eid, wid, did))
+        return elements[0]['microversionId']
+    else: 
+        print(response.text)
+        raise OnshapeAPIError(response.status_code)
+
+
+def get_workspace_microversion(did: str, wid: str, client: OnshapeClient = None) -> str: 
+    """Get the current microversion of a workspace. It moves on every change to any element 
+    of the document, so an unchanged value means the whole document is unchanged. 
+
+    Args:
+        did (str): document ID. 
+        wid (str): workspace (branch) ID. 
+        client (OnshapeClient, optional): HTTP client to use; defaults to CLIENT. 
+
+    Returns:
+        str: microversion ID of the workspace. 
+    """
+    # https://cad.onshape.com/glassworks/explorer/#/Document/getCurrentMicroversion 
+    response = (client or CLIENT).get(
+        BASE_URL, "/api/documents/d/{}/w/{}/currentmicroversion".format(did, wid)
+    )
+    if response.ok: 
+        return response.json()['microversion']
+    else: 
+        print(response.text)
+        raise OnshapeAPIError(response.status_code)
+
+
+def get_ps_features(did: str, wid: str, eid: str, client: OnshapeClient = None, 
+                    cache: FeatureCache = None, microversion: str = None, 
+                    fields: Tuple[str, ...] = None) -> Any: 
+    """Get the feature list of a part studio. 
+
+    Args:
+        did (str): document ID. 
+        wid (str): workspace (branch) ID. 
+        eid (str): element ID of a part studio. 
+        client (OnshapeClient, optional): HTTP client to use; defaults to CLIENT. 
+        cache (FeatureCache, optional): on-disk cache of feature lists. If given, the features 
+            are only downloaded when the element's microversion is not cached yet. 
+        microversion (str, optional): current microversion of the element, if already known 
+            (e.g. from get_all_elements). Otherwise it is looked up when a cache is given. 
+        fields (Tuple[str, ...], optional): keys to keep in every feature, e.g. SCAN_FIELDS. If given, 
+            only {'features': [trimmed features]} is returned and cached, without subFeatures and the 
+            other heavy fields the caller never reads. 
+
+    Returns:
+        Any: API response with the feature list of the part studio. 
+    """
+    if cache is not None: 
+        if microversion is None: 
+            microversion = get_element_microversion(did, wid, eid, client)
+        cache_key = (did, wid, eid, microversion) + tuple(fields or ())
+        features = cache.get(cache_key)
+        if features is not None: 
+            return features
+
+    # https://cad.onshape.com/glassworks/explorer/#/PartStudio/getPartStudioFeatures
+    response = (client or CLIENT).get(
+        BASE_URL, "/api/v12/partstudios/d/{}/w/{}/e/{}/features".format(did, wid, eid) # using v12 for simpler API response structure 
+    )
+    if response.ok: 
+        features = _load_features(response.content, fields)
+        if cache is not None: 
+            cache.put(cache_key, features)
+        return features
+    else: 
+        print(response.text)
+        print(response.headers)
+        raise OnshapeAPIError(response.status_code)
+    
+
+def _load_features(content: bytes, fields: Tuple[str, ...] = None) -> Dict[str, Any]: 
+    """Parse the body of a feature list response, with orjson if available. 
+
+    The raw bytes are parsed directly, without decoding them to text first. With fields, every 
+    feature is trimmed to those keys as soon as the body is parsed, so only the trimmed list 
+    outlives this call. 
+    """
+    payload = orjson.loads(content) if orjson is not None else json.loads(content)
+    if fields is None: 
+        return payload
+    return {'features': [{key: feature[key] for key in fields if key in feature} for feature in payload['features']]}
+
+
+def _get_sketch_entities(api_response: Dict[str, Any], sketch_name: str) -> Tuple[str, Dict[str, Any]]: 
+    """Retrieve all sketch entities in the master sketch, with useful geometric information. 
+
+    Args:
+        api_response (Dict[str, Any]): API response from the element that the master sketch lives in. 
+        sketch_name (str): name of the master sketch. If multiple sketches are renamed with 
+            the same name, only the first appearing is analyzed and returned. 
+
+    Returns:
+        Tuple[str, Dict[str, Any]]: Tuple[master_sketch_featureId, Dict[entityId: Dict[geo_info]]]. 
+            The geo_info dict follows the same format as returned by the API call. 
+    """
+    sketch_entities = {} # Dict[entityId: Dict[geo_info]]
+    for feature in api_response['features']: 
+        if feature['name'] == sketch_name: 
+            plane_side = "none"
+            query_strings = []
+            for p in feature.get("parameters", []):
+                if p.get("btType") == "BTMParameterQueryList-148":
+                    for q in p.get("queries", []):
+                        qs = q.get("queryString")
+                        if qs:
+                            query_strings.append(qs)
+
+            for qs in query_strings:
+                qs_lower = qs.lower()
+                if "top" in qs_lower and "plane" in qs_lower:
+                    plane_side = "top"
+                    break
+                if "front" in qs_lower and "plane" in qs_lower:
+                    plane_side = "front"
+                    break
+                if "right" in qs_lower and "plane" in qs_lower:
+                    plane_side = "right"
+                    break
+
+            for entity in feature['entities']: 
+                if entity['btType'] == 'BTMSketchPoint-158': # special case 
+                    sketch_entities[entity['entityId']] = {
+                        'btType': entity['btType'], 
+                        'y': entity['y'], 
+                        'x': entity['x'], 
+                        'isConstruction': entity['isConstruction'],
+                        'plane_side': plane_side,
+                        'featureId': feature.get('featureId')
+                    }
+                else: 
+                    sketch_entities[entity['entityId']] = entity['geometry'] 
+                    sketch_entities[entity['entityId']]['isConstruction'] = entity['isConstruction']
+                    sketch_entities[entity['entityId']]["plane_side"] = plane_side
+                    sketch_entities[entity['entityId']]["featureId"] = feature.get('featureId')
+
+                    # carry over trim parameters so JS can render finite segments
+                    if 'startParam' in entity:
+                        sketch_entities[entity['entityId']]['startParam'] = entity['startParam']
+                    if 'endParam' in entity:
+                        sketch_entities[entity['entityId']]['endParam'] = entity['endParam']
+                    
+            return feature['featureId'], sketch_entities
+    # If no matching master sketches found 
+    raise SketchNotFoundError("Given master sketch name \"{}\" not found".format(sketch_name))
+
+
+def _search_ref_entities(api_params: List[Any], sketch_ids: List[str]) -> List[str]: 
+    """Search for any entities from the master sketch that are referenced 
+    in this feature's parameters. 
+
+    Args:
+        api_params (List[Any]): a list of feature parameters returned by the Onshape API. 
+        sketch_ids (List[str]): a list of featureIds of master sketches. 
+
+    Returns:
+        List[str]: a list of base entityId prefixes (12 chars) that are referenced in this feature.
+            These need to be matched against entities_dep keys using prefix matching,
+            since full entityIds can have suffixes like .bottom, .top, .parallel.1, etc.
+    """
+    ref_entity_bases = [] 
+    _collect_ref_entities(api_params, frozenset(sketch_ids), _sketch_matcher(tuple(sketch_ids)), ref_entity_bases)
+    ref_entity_bases = list(set(ref_entity_bases)) # remove duplicates
+    return ref_entity_bases
+
+
+def _collect_ref_entities(api_params: List[Any], sketch_ids: FrozenSet[str], sketch_matcher: Pattern, ref_entity_bases: List[str]): 
+    # Body of _search_ref_entities, recursing into array parameters 
+    for param in api_params: 
+        if param['btType'] == "BTMParameterArray-2025":
+            for item in param['items']: 
+                _collect_ref_entities(item['parameters'], sketch_ids, sketch_matcher, ref_entity_bases)
+        elif param['btType'] == "BTMParameterQueryList-148": 
+            for query in param['queries']: 
+                decoded = _decode_query(query['queryString'])
+                if decoded is None: 
+                    continue
+                q_string, feature_ids, entity_bases = decoded
+                if feature_ids is not None: # parsed: a master sketch must be one of the referenced features 
+                    referenced = not sketch_ids.isdisjoint(feature_ids)
+                else: # unparsed: search the text 
+                    referenced = sketch_matcher.search(q_string) is not None
+                if referenced: 
+                    ref_entity_bases.extend(entity_bases)
+
+
+@lru_cache(maxsize=64)
+def _sketch_matcher(sketch_ids: Tuple[str, ...]) -> Pattern: 
+    """Compile the master sketch featureIds into one pattern, so a decoded query is searched for 
+    all of them in a single pass instead of one substring scan per sketch. Compiled once per set 
+    of master sketches. 
+    """
+    if not sketch_ids: 
+        return re.compile(r"(?!)") # matches nothing 
+    return re.compile("|".join(re.escape(sketch_id) for sketch_id in sorted(sketch_ids, key=len, reverse=True)))
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _decode_query(query_string: str) -> Optional[Tuple[str, Optional[FrozenSet[str]], FrozenSet[str]]]: 
+    """Decode a query string and collect the featureIds and base entityIds it references. 
+
+    Patterns and mirrors repeat the same query across array items and features, so the 
+    result is memoized by the raw query string (see query_cache_info). 
+
+    Args:
+        query_string (str): queryString of a query in a BTMParameterQueryList-148 parameter. 
+
+    Returns:
+        Optional[Tuple[str, Optional[FrozenSet[str]], FrozenSet[str]]]: the decoded query, the 
+            featureIds of its operation Ids and the base entityIds (12 chars) it references, or None 
+            if it is not a qCompressed query. If the query cannot be parsed, the featureIds are None 
+            and the entityIds are every 12 char prefix of the text between "$" separators, as before. 
+    """
+    if "query=qCompressed" not in query_string: 
+        return None
+    if "$Query" in query_string: # uncompressed query string 
+        q_string = query_string[23:-6]
+    else: # compressed query string 
+        q_string = zlib.decompress(base64.b64decode(query_string[28:-6])).decode("utf-8")
+    try: 
+        feature_ids, entity_bases = _QueryReader(q_string).references()
+    except ValueError: # syntax this reader does not know; fall back to the text 
+        return q_string, None, frozenset(item[:12] for item in q_string.split("$") if len(item) >= 12)
+    return q_string, feature_ids, entity_bases
+
+
+class _QueryReader: 
+    """Reader of the serialized query syntax found in decoded query strings. 
+
+    A value is one of: 
+        S<lengths>$<chars>  a string. <lengths> are "."-separated hex lengths of the parts that 
+                            follow "$"; a negative length -i reuses names[i] instead. The parts are 
+                            joined with ".". 
+        B<lengths>$<chars>  a class name, read like a string, followed by the value of the instance. 
+        C<i>                the class names[i], followed by the value of the instance. 
+        M<n> / A<n>         a map of n key/value pairs / an array of n values. 
+        E<i>                the string names[i] again. 
+        R<i>                a back-reference to an earlier value, which is not resolved here. 
+        D<number>, T, F     a number / true / false. 
+    and the root value is prefixed with "%". Every string and class name is appended to names, 
+    a string of several parts first appends its new parts. 
+
+    Only strings in value position are references: parts of the strings of an Id instance 
+    (e.g. 'F87s6fMQGjxRKDv_1.derived.*.merge.FHqEgo9hc2sdLj4_0.wireOp') are featureIds, and 
+    other strings starting with a 12 char part (e.g. 'wcXEtIidIpvE.bottom') are entityIds. 
+
+    Args:
+        q_string (str): a decoded query string. 
+    """
+    LENGTHS = re.compile(r"-?[0-9a-f]+(?:\.-?[0-9a-f]+)*\$")
+    INDEX = re.compile(r"[0-9a-f]+")
+    NUMBER = re.compile(r"-?[0-9a-f.]+")
+    ENTITY_ID = re.compile(r"[A-Za-z0-9]{12}")
+
+    def __init__(self, q_string: str): 
+        self.q_string = q_string
+        self.pos = 0
+        self.names = []
+        self.feature_ids = set()
+        self.entity_bases = set()
+
+    def references(self) -> Tuple[FrozenSet[str], FrozenSet[str]]: 
+        """Read the whole query and return (featureIds, base entityIds); raise ValueError if it is malformed."""
+        try: 
+            if self.q_string[:1] == "%": 
+                self.pos = 1
+            self._value(in_id=False)
+        except (IndexError, AttributeError) as e: # ran past the end or a number was missing 
+            raise ValueError("malformed query at {}".format(self.pos)) from e
+        if self.pos != len(self.q_string): 
+            raise ValueError("trailing characters in query at {}".format(self.pos))
+        return frozenset(self.feature_ids), frozenset(self.entity_bases)
+
+    def _match(self, pattern: Pattern) -> str: 
+        match = pattern.match(self.q_string, self.pos) # None raises AttributeError 
+        self.pos = match.end()
+        return match.group()
+
+    def _text(self) -> str: 
+        lengths = self._match(self.LENGTHS)[:-1].split(".")
+        parts = []
+        for length in lengths: 
+            if length.startswith("-"): 
+                parts.append(self.names[int(length[1:], 16)])
+            else: 
+                end = self.pos + int(length, 16)
+                if end > len(self.q_string): 
+                    raise ValueError("string past the end of the query")
+                parts.append(self.q_string[self.pos:end])
+                self.pos = end
+                if len(lengths) > 1: 
+                    self.names.append(parts[-1])
+        text = ".".join(parts)
+        self.names.append(text)
+        return text
+
+    def _value(self, in_id: bool, is_key: bool = False): 
+        tag = self.q_string[self.pos]
+        self.pos += 1
+        if tag in "SE": 
+            text = self._text() if tag == "S" else self.names[int(self._match(self.INDEX), 16)]
+            if in_id: 
+                self.feature_ids.update(text.split("."))
+            elif not is_key: 
+                base = text.split(".", 1)[0]
+                if self.ENTITY_ID.fullmatch(base) is not None: 
+                    self.entity_bases.add(base)
+        elif tag in "BC": 
+            class_name = self._text() if tag == "B" else self.names[int(self._match(self.INDEX), 16)]
+            self._value(in_id=class_name == "Id")
+        elif tag == "M": 
+            for _ in range(int(self._match(self.INDEX), 16)): 
+                self._value(in_id, is_key=True)
+                self._value(in_id)
+        elif tag == "A": 
+            for _ in range(int(self._match(self.INDEX), 16)): 
+                self._value(in_id)
+        elif tag in "RD": 
+            self._match(self.INDEX if tag == "R" else self.NUMBER)
+        elif tag not in "TF": 
+            raise ValueError("unknown value {!r} in query at {}".format(tag, self.pos - 1))
+
+
+def query_cache_info() -> Dict[str, int]: 
+    """Hit/miss counters of the decoded query cache used by _search_ref_entities.""" 
+    info = _decode_query.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'max_size': info.maxsize}
+
+
+def _build_prefix_index(entities_dep: Dict[str, List]) -> Dict[str, List[str]]:
+    """Index the full entityIds of the master sketches by every prefix they can be matched with.
+
+    EntityIds can be either exactly 12 chars (e.g., 'BTw0Oed29F1g') or 
+    12 chars followed by suffixes (e.g., 's5hilxbj2scx.bottom', 's5hilxbj2scx.parallel.1').
+    A full entityId matches a base if it is equal to it, or if it starts with the base followed by ".", 
+    so it is indexed under itself and under everything before each of its "." separators. 
+    Build this once per run, after all master sketch entities are known. 
+
+    Args:
+        entities_dep (Dict[str, List]): dictionary of full entityIds to their dependencies.
+
+    Returns:
+        Dict[str, List[str]]: Dict[base prefix: List[full entityIds]], with the full entityIds 
+            in the same order as in entities_dep. 
+    """
+    prefix_index = {}
+    for full_entity_id in entities_dep:
+        prefix_index.setdefault(full_entity_id, []).append(full_entity_id)
+        dot = full_entity_id.find(".")
+        while dot != -1:
+            prefix_index.setdefault(full_entity_id[:dot], []).append(full_entity_id)
+            dot = full_entity_id.find(".", dot + 1)
+    return prefix_index
+
+
+def _match_entity_by_prefix(entity_base: str, prefix_index: Dict[str, List[str]]) -> List[str]:
+    """Find all entityIds of the master sketches that match the given base prefix.
+    
+    Args:
+        entity_base (str): 12-character base prefix to match.
+        prefix_index (Dict[str, List[str]]): index built by _build_prefix_index.
+    
+    Returns:
+        List[str]: list of matching full entityIds.
+    """
+    return prefix_index.get(entity_base, [])
+
+
+def _is_derived_master_sketch(api_params: List[Any], did: str, eid: str, fids: List[str]) -> bool: 
+    """Check if the derive feature is importing one or more master sketches. 
+
+    Args:
+        api_params (List[Any]): a list of feature parameters returned by the Onshape API. 
+        did (str): document ID of the source master sketch. 
+        eid (str): element ID of the source master sketch. 
+        fids (List[str]): a list of feature IDs of the source master sketches.
+
+    Returns:
+        bool: if the derive feature is importing one or more master sketches.
+    """
+    for param in api_params: 
+        if param['btType'] == "BTMParameterReferencePartStudio-3302": 
+            namespace = param['namespace'].split("::")
+            for item in namespace: 
+                if item[0] == "e": 
+                    source_eid = item[1:]
+            if eid != source_eid: 
+                return False
+            for query in param['partQuery']['queries']: 
+                if query['btType'] == "BTMIndividualCreatedByQuery-137" and query['featureId'] in fids: 
+                    return True # individual master sketch imported
+                elif query['btType'] == "BTMIndividualQuery-138":
+                    return True # entire part studio imported
+                else: 
+                    pass # check next query if the derived feature is importing multiple sketches 
+        elif param['btType'] == "BTMParameterQueryList-148": 
+            for query in param['queries']: 
+                if query['btType'] == "BTMIndividualCreatedByQuery-137": 
+                    if query['featureId'] in fids: 
+                        return True
+    return False 
+    
+
+def _get_docs_in_parent_folder(did: str, client: OnshapeClient = None) -> Tuple[List[str], List[str], List[str]]: 
+    """Get all documents within the folder that the document belongs to. 
+
+    Args:
+        did (str): document ID. 
+        client (OnshapeClient, optional): HTTP client to use; defaults to CLIENT. 
+
+    Returns:
+        Tuple[List[str], List[str], List[str]]: same as get_docs_in_folder. 
+    """
+    return get_docs_in_folder(get_folder(did, client), client)
+
+
+def _starts_at_master_sketches(master_sketch_ids: List[str]) -> Callable[[Dict[str, Any]], bool]: 
+    """Start condition of the source element: the scan starts at the master sketches themselves."""
+    return lambda feature: feature['featureId'] in master_sketch_ids
+
+
+def _starts_at_derived_master_sketches(did: str, source_eid: str, master_sketch_ids: List[str]) -> Callable[[Dict[str, Any]], bool]: 
+    """Start condition of every other part studio: the scan starts once the master sketches are derived into it."""
+    return lambda feature: (feature['featureType'] == "importDerived" 
+                            and _is_derived_master_sketch(feature['parameters'], did, source_eid, master_sketch_ids))
+
+
+def _scan_features(features: Iterable[Dict[str, Any]], master_sketch_ids: List[str], starts: Callable[[Dict[str, Any]], bool], 
+                   yield_starts: bool = False) -> Iterator[Tuple[Dict[str, Any], List[str]]]: 
+    """Scan a feature list in order for features that reference entities in the master sketches. 
+    Query strings are only searched after the start feature (the master sketch, or the feature 
+    deriving it), as nothing before it can reference the master sketches. 
+
+    Args:
+        features (Iterable[Dict[str, Any]]): features of a part studio, in feature list order. 
+        master_sketch_ids (List[str]): a list of feature IDs of the master sketches. 
+        starts (Callable[[Dict[str, Any]], bool]): start condition, see _starts_at_master_sketches 
+            and _starts_at_derived_master_sketches. 
+        yield_starts (bool): also yield every start feature, with no entities. The start condition is 
+            then checked on every feature, otherwise only until the scan has started. 
+
+    Yields:
+        Tuple[Dict[str, Any], List[str]]: the feature and the base entityIds it references, for every 
+            feature that references at least one. The feature dicts are the input ones, not copies. 
+    """
+    searching = False 
+    for feature in features: 
+        if (yield_starts or not searching) and starts(feature): 
+            searching = True 
+            if yield_starts: 
+                yield feature, [] 
+        elif searching and feature['btType'] == "BTMFeature-134" and feature['featureType'] != 'importDerived': # ignore sketches 
+            ref_entity_bases = _search_ref_entities(feature['parameters'], master_sketch_ids)
+            if ref_entity_bases: 
+                yield feature, ref_entity_bases
+
+
+def _scan_element(features: Iterable[Dict[str, Any]], did: str, wid: str, eid: str, master_sketch_ids: List[str], 
+                  prefix_index: Dict[str, List[str]], starts: Callable[[Dict[str, Any]], bool], 
+                  yield_starts: bool = False) -> Tuple[Dict[str, Any], List[Tuple[str, Tuple]]]: 
+    """Collect the dependent features and the dependency edges of one part studio with _scan_features. 
+    Used for the source element and every other part studio alike. 
+
+    Args:
+        features (Iterable[Dict[str, Any]]): features of the part studio, in feature list order. 
+        did (str): document ID of the scanned part studio. 
+        wid (str): workspace ID of the scanned part studio. 
+        eid (str): element ID of the scanned part studio. 
+        master_sketch_ids (List[str]): a list of feature IDs of the master sketches. 
+        prefix_index (Dict[str, List[str]]): full entityIds of the master sketches, see _build_prefix_index. 
+        starts (Callable[[Dict[str, Any]], bool]): start condition of the scan. 
+        yield_starts (bool): also list the start features in the dependent features (the master sketches 
+            of the source element). 
+
+    Returns:
+        Tuple[Dict[str, Any], List[Tuple[str, Tuple]]]: Tuple[Dict[fid: feature_info], List[Tuple[entityId, dep_feature]]], 
+            the dependent features for doc_info and the dependency edges in the order they were found. 
+    """
+    found, edges = {}, [] 
+    for feature, ref_entity_bases in _scan_features(features, master_sketch_ids, starts, yield_starts): 
+        fid = feature['featureId']
+        found[fid] = {'name': feature['name'], 'featureType': feature['featureType']}
+        for entity_base in ref_entity_bases: 
+            for full_entity_id in _match_entity_by_prefix(entity_base, prefix_index):
+                edges.append((full_entity_id, (did, wid, eid, fid)))
+    return found, edges
+
+
+class DependencySnapshot: 
+    """State kept between get_dependency calls to refresh the result incrementally. 
+
+    For every scanned part studio, the snapshot stores a fingerprint (the element microversion) 
+    together with the dependent features and dependency edges found in it. On the next call, 
+    part studios whose fingerprint did not change are neither downloaded nor scanned again; 
+    their stored edges are spliced into the new result instead. All records are dropped when 
+    the source element, the master sketches or their entities change. 
+
+    The snapshot also stores the element list of every document with the workspace microversion 
+    it was listed at. A document whose microversion did not move is not listed again, so a refresh 
+    of an unchanged folder costs one call per document. 
+    """
+
+    def __init__(self): 
+        self.source_key = None # (did, wid, eid, master_sketch_ids, entityIds) the records were computed against 
+        self.elements = {} # Dict[(did, wid, eid): (fingerprint, features, edges)] 
+        self.documents = {} # Dict[(did, wid): (workspace microversion, eid_list, ele_names, ele_mvs)] 
+        self.prefix_index = None # prefix index of the master sketch entities, see _build_prefix_index 
+        self.scanned = 0 # number of part studios scanned (not reused) in the last call 
+
+
+class CrawlProgress: 
+    """Counters of a running get_dependency call, safe to read from another thread. 
+
+    Totals grow as the crawl discovers more documents and elements, so they are only final 
+    once the crawl has finished. Elements reused from a snapshot count as done without their 
+    features being scanned. peak_rss is the largest resident set size of the process seen 
+    while the crawl ran, in bytes, to size the workers that run crawls. A progress can follow 
+    the one of another crawl, e.g. a crawl it joined or the one that computed a cached result, 
+    and then reports that crawl's counters instead of its own. 
+    """
+
+    def __init__(self): 
+        self._lock = threading.Lock()
+        self._followed = None # CrawlProgress reported instead of these counters 
+        self.documents_total = 0 
+        self.documents = 0 # documents whose elements were all processed 
+        self.elements_total = 0 
+        self.elements = 0 # part studios processed, scanned or reused 
+        self.features = 0 # features scanned 
+        self.peak_rss = 0 # bytes, sampled after every part studio 
+
+    def add(self, **counters: int): 
+        with self._lock: 
+            for name, value in counters.items(): 
+                setattr(self, name, getattr(self, name) + value)
+
+    def sample_memory(self): 
+        rss = current_rss()
+        if rss is None: # not readable on this platform 
+            return
+        with self._lock: 
+            self.peak_rss = max(self.peak_rss, rss)
+
+    def follow(self, other: "CrawlProgress"): 
+        """Report the counters of other from now on.""" 
+        with self._lock: 
+            self._followed = other
+
+    def as_dict(self) -> Dict[str, int]: 
+        with self._lock: 
+            followed = self._followed
+            if followed is None: 
+                return {
+                    'documents': self.documents, 'documents_total': self.documents_total, 
+                    'elements': self.elements, 'elements_total': self.elements_total, 
+                    'features': self.features, 'peak_rss': self.peak_rss, 
+                }
+        return followed.as_dict() # outside the lock, the followed progress takes its own 
+
+
+LOAD_ERRORS = (ValueError, requests.RequestException) # failed API calls, see the fetchers above 
+
+
+def _error_event(did: str, wid: str, eid: Optional[str], name: str, error: Exception) -> Dict[str, Any]: 
+    return {'event': "error", 'did': did, 'wid': wid, 'eid': eid, 'name': name, 'error': "{}: {}".format(type(error).__name__, error)}
+
+
+class _FetchWindow: 
+    """Part studio fetches of one crawl, submitted to the pool in crawl order. 
+
+    Without max_memory every fetch is submitted right away. With it, fetches are held back while 
+    the resident set size of the whole process is above max_memory, and submitted as the crawl 
+    scans and releases earlier ones. 
+    The fetch the crawl waits for next is always submitted, so a crawl over the ceiling goes on 
+    with one fetch at a time instead of stalling. Where the resident set size cannot be read 
+    (see memory_usage.rss_available), max_memory is ignored with a warning. Used from the 
+    crawl's own thread only. 
+    """
+
+    def __init__(self, pool: ThreadPoolExecutor, max_memory: int = None): 
+        if max_memory is not None and not rss_available(): 
+            warnings.warn("the resident set size cannot be read on this platform; max_memory is ignored")
+            max_memory = None
+        self.pool = pool
+        self.max_memory = max_memory
+        self._held = deque() # (future, fn, args) not submitted yet, in crawl order 
+        self._held_futures = set()
+
+    def submit(self, fn: Callable, *args) -> Future: 
+        if self.max_memory is None: 
+            return self.pool.submit(fn, *args)
+        future = Future()
+        self._held.append((future, fn, args))
+        self._held_futures.add(future)
+        self.pump()
+        return future
+
+    def pump(self, until: Future = None): 
+        """Submit held fetches while under max_memory, and in any case up to and including until."""
+        while self._held and (until in self._held_futures or (current_rss() or 0) < self.max_memory): # unreadable counts as under 
+            future, fn, args = self._held.popleft()
+            self._held_futures.discard(future)
+            self.pool.submit(_run_into, future, fn, args)
+
+
+def _run_into(future: Future, fn: Callable, args: Tuple): 
+    # Run a held fetch of _FetchWindow on a pool thread and settle its future 
+    if not future.set_running_or_notify_cancel(): 
+        return
+    try: 
+        future.set_result(fn(*args))
+    except BaseException as e: 
+        future.set_exception(e)
+
+
+def get_dependency(did: str, wid: str, eid: str, master_sketches: List[str], max_workers: int = DEFAULT_MAX_WORKERS, 
+                   client: OnshapeClient = None, cache: FeatureCache = None, snapshot: DependencySnapshot = None, 
+                   progress: CrawlProgress = None, errors: List[Dict[str, Any]] = None, max_memory: int = None): 
+    """Get all direct downstream dependencies to every sketch entity in the 
+    master sketch in an Onshape element. 
+
+    Element lists and part studio features are fetched concurrently with a bounded 
+    thread pool, while the features are scanned in the same order as a serial crawl, 
+    so the result does not depend on the number of workers. 
+
+    Args:
+        did (str): document ID where the master sketch is created in. 
+        wid (str): workspace ID where the master sketch is created in. 
+            This must be a workspace, not a version or microversion. 
+        eid (str): element ID where the master sketch is created in. 
+            This must be a Part Studio, not an Assembly, etc. 
+        master_sketches (List[str]): a list of names of all master sketchs. If multiple sketches are renamed with 
+            the same name, only the first appearing is analyzed and returned. 
+        max_workers (int): maximum number of concurrent Onshape API calls. Use 1 for a serial crawl. 
+        client (OnshapeClient, optional): HTTP client shared by every call of the crawl; defaults to CLIENT. 
+        cache (FeatureCache, optional): on-disk cache of feature lists; unchanged elements are 
+            then read from the cache instead of being downloaded again. 
+        snapshot (DependencySnapshot, optional): state of the previous call for the same folder. If given, 
+            only part studios that changed since then are scanned again, and the snapshot is updated in place. 
+        progress (CrawlProgress, optional): counters updated while the crawl runs, e.g. to report it to a client. 
+        errors (List[Dict[str, Any]], optional): if given, documents and part studios that fail to load 
+            are appended to this list (see iter_dependency) and left out of the result instead of aborting 
+            the crawl. They are not kept in the snapshot, so the next call retries only them. 
+            Failures of the source element or of the folder listing are always raised. 
+        max_memory (int, optional): memory ceiling of the process in bytes, for very large folders. If given, 
+            part studio downloads are held back while the resident set size is above it (see iter_dependency), 
+            and doc_info only lists the elements with dependent features; every document then also gets an 
+            'elements_scanned' count of its part studios processed. The ceiling is process-wide: it is 
+            compared with the RSS of the whole process, including other crawls running at the same time 
+            and the client's ETag store, so those should be bounded well below it. 
+
+    Returns:
+        entities_geo (List[Dict[entityId: Dict[geo_info]]]): a list of geometric information for rendering individual entities; 
+        entities_dep (Dict[entityId: List[dep_features]]): a list of downstream dependent features for every sketch entity; 
+        doc_info (Dict[did: info]): user-defined document information for presentation (see detailed specifications below);
+        mate_connectors (Dict[featureId: List[connector_info]]): mate connector data extracted from features.
+    """
+    entities_geo, entities_dep, doc_info, mate_connectors = [], {}, {}, {}
+    for event in iter_dependency(did, wid, eid, master_sketches, max_workers, client, cache, snapshot, progress, 
+                                 errors is not None, max_memory): 
+        if event['event'] == "geometry": 
+            entities_geo, mate_connectors = event['entities_geo'], event['mate_connectors']
+            for geo_dict in entities_geo: 
+                entities_dep.update({key: [] for key in geo_dict.keys()})
+        elif event['event'] == "document": 
+            doc_info[event['did']] = {'wid': event['wid'], 'name': event['name'], 'elements': {}}
+            if max_memory is not None: 
+                doc_info[event['did']]['elements_scanned'] = 0
+        elif event['event'] == "element": 
+            if max_memory is None or event['features']: 
+                doc_info[event['did']]['elements'][event['eid']] = {'name': event['name'], 'features': event['features']}
+            if max_memory is not None: 
+                doc_info[event['did']]['elements_scanned'] += 1
+            for full_entity_id, dep_feature in event['edges']: 
+                entities_dep[full_entity_id].append(dep_feature)
+        elif event['event'] == "error": 
+            errors.append({key: value for key, value in event.items() if key != 'event'})
+    return entities_geo, entities_dep, doc_info, mate_connectors
+
+
+def iter_dependency(did: str, wid: str, eid: str, master_sketches: List[str], max_workers: int = DEFAULT_MAX_WORKERS, 
+                    client: OnshapeClient = None, cache: FeatureCache = None, snapshot: DependencySnapshot = None, 
+                    progress: CrawlProgress = None, tolerate_errors: bool = False, 
+                    max_memory: int = None) -> Iterator[Dict[str, Any]]: 
+    """Same crawl as get_dependency, yielding its result piece by piece as soon as each piece is known, 
+    so a client can render the master sketches before the slowest document is scanned. 
+    Arguments are the same as get_dependency, except for tolerate_errors: if set, failures to load 
+    other documents and part studios are yielded as error events instead of being raised. 
+    Closing the generator early cancels the pending fetches. 
+
+    Every feature list is released once its part studio is scanned. Downloads normally run ahead of 
+    the scan; with max_memory, they only do so while the whole process (not just this crawl) stays 
+    under that many bytes. 
+
+    Yields:
+        Dict[str, Any]: events in crawl order, each with an 'event' key: 
+            {'event': "geometry", 'entities_geo': ..., 'mate_connectors': ...} once, first; 
+            {'event': "document", 'did': ..., 'wid': ..., 'name': ...} before the elements of that document; 
+            {'event': "element", 'did': ..., 'eid': ..., 'name': ..., 'features': Dict[fid: feature_info], 
+                'edges': List[Tuple[entityId, dep_feature]]} for every part studio; 
+            {'event': "error", 'did': ..., 'wid': ..., 'eid': ... (None for a whole document), 'name': ..., 
+                'error': str} instead of the element events that could not be computed, with tolerate_errors; 
+            {'event': "done", 'progress': Dict[str, int]} once, last. 
+        Replaying them in order rebuilds the result of get_dependency. 
+    """
+    if max_workers < 1: 
+        raise ValueError("max_workers must be at least 1")
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try: 
+        yield from _iter_dependency(_FetchWindow(pool, max_memory), client or CLIENT, cache, snapshot, progress or CrawlProgress(), 
+                                    tolerate_errors, did, wid, eid, master_sketches)
+    finally: 
+        pool.shutdown(wait=False, cancel_futures=True) # drop pending fetches if the crawl failed or was abandoned 
+
+
+def _iter_dependency(fetches: _FetchWindow, client: OnshapeClient, cache: FeatureCache, snapshot: DependencySnapshot, 
+                     progress: CrawlProgress, tolerate_errors: bool, did: str, wid: str, eid: str, 
+                     master_sketches: List[str]) -> Iterator[Dict[str, Any]]: 
+    """Body of iter_dependency; every Onshape call except the source element is submitted to the pool."""
+    pool = fetches.pool
+    entities_geo = [] # List[Dict[entityId: Dict[geo_info]]]
+    entity_ids = {} # Dict[entityId: None], every entityId of the master sketches in order 
+    
+    old_documents = snapshot.documents if snapshot is not None else {} 
+    new_documents = {} # Dict[(did, wid): (workspace microversion, eid_list, ele_names, ele_mvs)] 
+
+    def _list_elements(ele_did: str, ele_wid: str) -> Tuple[List[str], List[str], List[str]]: 
+        # Reuse the stored element list of a document whose workspace did not change since the last call. 
+        # The microversion is read before listing, so a change made in between is seen next time. 
+        doc_mv = get_workspace_microversion(ele_did, ele_wid, client) if snapshot is not None else None 
+        listing = old_documents.get((ele_did, ele_wid))
+        if listing is None or doc_mv is None or listing[0] != doc_mv: 
+            listing = (doc_mv, *get_all_elements(ele_did, ele_wid, client))
+        new_documents[(ele_did, ele_wid)] = listing
+        return list(listing[1]), list(listing[2]), list(listing[3]) # copies, the caller pops from them 
+
+    # Start listing elements and documents while the master sketch is parsed 
+    elements_future = pool.submit(_list_elements, did, wid)
+    docs_future = pool.submit(_get_docs_in_parent_folder, did, client)
+
+    # Retrieve all sketch entities in the master sketch 
+    source_ps = get_ps_features(did, wid, eid, client, cache)
+    mate_connectors = _extract_mate_connectors(source_ps)
+    
+    master_sketch_ids = [] 
+    for master_sketch in master_sketches:
+        master_sketch_id, geo_dict = _get_sketch_entities(source_ps, master_sketch) 
+        master_sketch_ids.append(master_sketch_id)
+        entities_geo.append(geo_dict)
+        entity_ids.update(dict.fromkeys(geo_dict.keys()))
+    yield {'event': "geometry", 'entities_geo': entities_geo, 'mate_connectors': mate_connectors}
+
+    # Records of the previous call can only be reused if they were matched against the same entities 
+    source_key = (did, wid, eid, tuple(master_sketch_ids), tuple(entity_ids))
+    unchanged_source = snapshot is not None and snapshot.source_key == source_key
+    old_records = snapshot.elements if unchanged_source else {}
+    prefix_index = snapshot.prefix_index if unchanged_source else _build_prefix_index(entity_ids) # base entityId -> full entityIds 
+    new_records = {} # Dict[(did, wid, eid): (fingerprint, features, edges)] 
+
+    def _submit_element(ele_did: str, ele_wid: str, ele_eid: str, ele_mv: str): 
+        # Reuse the stored record of an unchanged element, otherwise queue its download 
+        record = old_records.get((ele_did, ele_wid, ele_eid))
+        if record is not None and record[0] == ele_mv: 
+            return record
+        return fetches.submit(get_ps_features, ele_did, ele_wid, ele_eid, client, cache, ele_mv, SCAN_FIELDS)
+
+    def _element_event(ele_did: str, ele_wid: str, ele_eid: str, ele_name: str, ele_mv: str, pending) -> Dict[str, Any]: 
+        if isinstance(pending, tuple): # reused record 
+            record = pending
+            progress.add(elements=1)
+        else: 
+            fetches.pump(until=pending) # the crawl waits for this one now 
+            try: 
+                ele_def = pending.result()
+            except LOAD_ERRORS as e: 
+                if not tolerate_errors: 
+                    raise
+                progress.add(elements=1)
+                return _error_event(ele_did, ele_wid, ele_eid, ele_name, e) # no record, so it is fetched again next time 
+            features, edges = _scan_element(ele_def['features'], ele_did, ele_wid, ele_eid, master_sketch_ids, prefix_index, 
+                                            _starts_at_derived_master_sketches(ele_did, eid, master_sketch_ids))
+            record = (ele_mv, features, edges)
+            progress.add(elements=1, features=len(ele_def['features']))
+            progress.sample_memory()
+        new_records[(ele_did, ele_wid, ele_eid)] = record
+        return {'event': "element", 'did': ele_did, 'eid': ele_eid, 'name': ele_name, 'features': dict(record[1]), 'edges': record[2]}
+
+    # Queue every part studio fetch up front; results are consumed in crawl order below 
+    eid_list, ele_names, ele_mvs = elements_future.result()
+    source_ind = eid_list.index(eid) 
+    source_name = ele_names[source_ind]
+    eid_list.pop(source_ind) # avoid double counting the source element 
+    ele_names.pop(source_ind)
+    ele_mvs.pop(source_ind)
+    progress.add(documents_total=1, elements_total=len(eid_list) + 1)
+    ele_pending = [_submit_element(did, wid, ele_id, ele_mv) for ele_id, ele_mv in zip(eid_list, ele_mvs)]
+
+    did_list, wid_list, doc_name = docs_future.result()
+    source_ind = did_list.index(did) 
+    yield {'event': "document", 'did': did, 'wid': wid, 'name': doc_name[source_ind]}
+    did_list.pop(source_ind) # avoid double counting the source document 
+    wid_list.pop(source_ind)
+    doc_name.pop(source_ind)
+    progress.add(documents_total=len(did_list))
+    doc_elements = [pool.submit(_list_elements, did_list[doc_ind], wid_list[doc_ind]) for doc_ind in range(len(did_list))]
+    doc_pending = [] # List[Tuple[eid_list, ele_names, ele_mvs, List[Future | record]] | Exception] for every other document 
+    for doc_ind in range(len(did_list)): 
+        try: 
+            doc_eid_list, doc_ele_names, doc_ele_mvs = doc_elements[doc_ind].result()
+        except LOAD_ERRORS as e: 
+            if not tolerate_errors: 
+                raise
+            doc_pending.append(e)
+            continue
+        progress.add(elements_total=len(doc_eid_list))
+        doc_pending.append((doc_eid_list, doc_ele_names, doc_ele_mvs, [
+            _submit_element(did_list[doc_ind], wid_list[doc_ind], ele_id, ele_mv) 
+            for ele_id, ele_mv in zip(doc_eid_list, doc_ele_mvs)
+        ]))
+    
+    # Search for features that reference entities in the master sketch 
+    # From the same element 
+    source_features, source_edges = _scan_element(source_ps['features'], did, wid, eid, master_sketch_ids, prefix_index, 
+                                                  _starts_at_master_sketches(master_sketch_ids), yield_starts=True)
+    progress.add(elements=1, features=len(source_ps['features']))
+    progress.sample_memory()
+    source_ps = None # everything needed from it is extracted 
+    yield {'event': "element", 'did': did, 'eid': eid, 'name': source_name, 'features': source_features, 'edges': source_edges}
+    
+    # From the same document but different elements 
+    for ele_ind in range(len(eid_list)): 
+        event = _element_event(did, wid, eid_list[ele_ind], ele_names[ele_ind], ele_mvs[ele_ind], ele_pending[ele_ind])
+        ele_pending[ele_ind] = None # release the feature list held by its future 
+        yield event
+    progress.add(documents=1)
+    
+    # From every other document in the same folder 
+    for doc_ind in range(len(did_list)): 
+        yield {'event': "document", 'did': did_list[doc_ind], 'wid': wid_list[doc_ind], 'name': doc_name[doc_ind]}
+        if isinstance(doc_pending[doc_ind], Exception): # its elements could not be listed 
+            yield _error_event(did_list[doc_ind], wid_list[doc_ind], None, doc_name[doc_ind], doc_pending[doc_ind])
+            progress.add(documents=1)
+            continue
+        eid_list, ele_names, ele_mvs, ele_pending = doc_pending[doc_ind]
+        doc_pending[doc_ind] = None 
+        for ele_ind in range(len(eid_list)): # from every element in the document 
+            event = _element_event(did_list[doc_ind], wid_list[doc_ind], eid_list[ele_ind], ele_names[ele_ind], ele_mvs[ele_ind], ele_pending[ele_ind])
+            ele_pending[ele_ind] = None # release the feature list held by its future 
+            yield event
+        progress.add(documents=1)
+    
+    if snapshot is not None: 
+        snapshot.source_key = source_key
+        snapshot.prefix_index = prefix_index
+        snapshot.scanned = sum(1 for record_key, record in new_records.items() if old_records.get(record_key) is not record)
+        snapshot.elements = new_records
+        snapshot.documents = new_documents
+    yield {'event': "done", 'progress': progress.as_dict()}
+
+
+
+if __name__ == "__main__": 
+    # Master doc: https://cad.onshape.com/documents/85b058cdb321e64ab5d1f364/w/a54015e3085683ae412da7b1/e/78ac040ab4d3dfed2febd8a3
+    # Folder ID: 6c38524bec94c0e6eb7f532f
+    # entities_geo, entities_dep, doc_info, mate_connectors = get_dependency('85b058cdb321e64ab5d1f364', 'a54015e3085683ae412da7b1', '78ac040ab4d3dfed2febd8a3', ['Master Sketch'])
+    # results = [entities_geo, entities_dep, doc_info, mate_connectors]
+    # json.dump(results, open('test_output_spray.json', 'w'), indent=2)
+    
+    # Master doc: https://cad.onshape.com/documents/56e646580a50f305280bbafc/w/5a99299fc7972f9cefe014a6/e/482f1ae4627799170e6a9a4e
+    # Folder ID: 514f41dd2f31f68c801bfeaa
+    entities_geo, entities_dep, doc_info, mate_connectors = get_dependency(
+        '56e646580a50f305280bbafc', '5a99299fc7972f9cefe014a6', '482f1ae4627799170e6a9a4e', 
+        ['Drivebase Top', 'Drivebase Side', 'Substation', 'Arm', 'Hopper', 'Frame Side', 'Claw Sketch', 'Front Home Coral', 'Coral Grabber', 'Chain Plan', 'Tube Sketch']
+    )
+    results = [entities_geo, entities_dep, doc_info, mate_connectors]
+    output_path = Path(__file__).parent / 'test_output_robot.json'
+    json.dump(results, open(output_path, 'w'), indent=2)
+
@@ -0,0 +1,66 @@
+"""Load driver for the /get_dependency route, usually run against a backend pointed at mock_onshape.py:
+
+    python mock_onshape.py --latency 0.05 &
+    ONSHAPE_BASE_URL=http://127.0.0.1:5002 python backend_dependency.py &
+    python load_test.py --requests 200 --concurrency 16
+
+Prints the throughput and latency percentiles of the whole crawl as JSON.
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+
+import requests
+
+
+def _percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def run(url: str, n_requests: int, concurrency: int) -> Dict[str, Any]:
+    """Send n_requests GET requests to url from `concurrency` threads and summarize their latencies."""
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+
+    def _one(_):
+        start = time.perf_counter()
+        try:
+            status = session.get(url).status_code
+        except requests.RequestException:
+            status = None
+        return time.perf_counter() - start, status
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(_one, range(n_requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, status in samples if status == 200)
+    return {
+        'url': url,
+        'requests': n_requests,
+        'concurrency': concurrency,
+        'ok': len(latencies),
+        'failed': n_requests - len(latencies),
+        'elapsed_s': elapsed,
+        'throughput_rps': n_requests / elapsed,
+        'latency_s': {
+            'p50': _percentile(latencies, 0.50),
+            'p90': _percentile(latencies, 0.90),
+            'p99': _percentile(latencies, 0.99),
+            'max': latencies[-1] if latencies else 0.0,
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:5001/get_dependency")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    print(json.dumps(run(args.url, args.requests, args.concurrency), indent=2))
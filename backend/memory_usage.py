@@ -0,0 +1,145 @@
+import ctypes
+import ctypes.util
+import os
+import sys
+from typing import Callable, Optional, Tuple
+
+try: # optional, reads the memory of the process on every platform
+    import psutil
+except ImportError:
+    psutil = None
+
+try: # not available on Windows
+    import resource
+except ImportError:
+    resource = None
+
+
+def _psutil_reader() -> Callable[[], Tuple[int, int]]:
+    process = psutil.Process()
+
+    def _read() -> Tuple[int, int]:
+        info = process.memory_info()
+        return info.rss, getattr(info, "peak_wset", 0) # peak only known on Windows
+    return _read
+
+
+def _proc_reader() -> Callable[[], Tuple[int, int]]:
+    page_size = os.sysconf("SC_PAGE_SIZE")
+
+    def _read() -> Tuple[int, int]:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * page_size, 0
+    return _read
+
+
+class _ProcessMemoryCounters(ctypes.Structure): # PROCESS_MEMORY_COUNTERS of psapi.h
+    _fields_ = [
+        ("cb", ctypes.c_ulong), ("PageFaultCount", ctypes.c_ulong),
+        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+    ]
+
+
+def _windows_reader() -> Callable[[], Tuple[int, int]]:
+    kernel32 = ctypes.WinDLL("kernel32")
+    psapi = ctypes.WinDLL("psapi")
+    kernel32.GetCurrentProcess.restype = ctypes.c_void_p
+    psapi.GetProcessMemoryInfo.argtypes = [ctypes.c_void_p, ctypes.POINTER(_ProcessMemoryCounters), ctypes.c_ulong]
+    psapi.GetProcessMemoryInfo.restype = ctypes.c_int
+
+    def _read() -> Tuple[int, int]:
+        counters = _ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        if not psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            raise OSError("GetProcessMemoryInfo failed")
+        return counters.WorkingSetSize, counters.PeakWorkingSetSize
+    return _read
+
+
+class _TimeValue(ctypes.Structure): # time_value_t of mach/time_value.h
+    _fields_ = [("seconds", ctypes.c_int), ("microseconds", ctypes.c_int)]
+
+
+class _MachTaskBasicInfo(ctypes.Structure): # mach_task_basic_info of mach/task_info.h
+    _pack_ = 4
+    _fields_ = [
+        ("virtual_size", ctypes.c_uint64), ("resident_size", ctypes.c_uint64), ("resident_size_max", ctypes.c_uint64),
+        ("user_time", _TimeValue), ("system_time", _TimeValue), ("policy", ctypes.c_int), ("suspend_count", ctypes.c_int),
+    ]
+
+
+MACH_TASK_BASIC_INFO = 20 # task_info flavor
+
+
+def _mach_reader() -> Callable[[], Tuple[int, int]]:
+    libc = ctypes.CDLL(ctypes.util.find_library("c"))
+    task = ctypes.c_uint32.in_dll(libc, "mach_task_self_").value # what the mach_task_self() macro reads
+    libc.task_info.argtypes = [ctypes.c_uint32, ctypes.c_uint32, ctypes.POINTER(_MachTaskBasicInfo), ctypes.POINTER(ctypes.c_uint32)]
+    libc.task_info.restype = ctypes.c_int
+
+    def _read() -> Tuple[int, int]:
+        info = _MachTaskBasicInfo()
+        count = ctypes.c_uint32(ctypes.sizeof(info) // 4) # in natural_t units
+        if libc.task_info(task, MACH_TASK_BASIC_INFO, ctypes.byref(info), ctypes.byref(count)) != 0:
+            raise OSError("task_info failed")
+        return info.resident_size, info.resident_size_max
+    return _read
+
+
+def _memory_reader() -> Optional[Callable[[], Tuple[int, int]]]:
+    """Function returning the (current, peak or 0) resident set size in bytes, or None if this platform has none."""
+    factories = [_psutil_reader] if psutil is not None else []
+    if sys.platform == "win32":
+        factories.append(_windows_reader)
+    elif sys.platform == "darwin":
+        factories.append(_mach_reader)
+    else:
+        factories.append(_proc_reader)
+    for factory in factories:
+        try:
+            read = factory()
+            read() # fails here rather than in the middle of a crawl
+            return read
+        except (OSError, AttributeError, ValueError, IndexError, TypeError):
+            continue
+    return None
+
+
+_read_memory = _memory_reader()
+
+
+def rss_available() -> bool:
+    """Whether current_rss can read the resident set size on this platform.
+
+    It can on Linux (/proc), Windows (GetProcessMemoryInfo), macOS (task_info) and anywhere
+    psutil is installed. Memory ceilings cannot be enforced elsewhere.
+    """
+    return _read_memory is not None
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes, or None if it cannot be read (see rss_available)."""
+    if _read_memory is None:
+        return None
+    try:
+        return _read_memory()[0]
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss() -> int:
+    """Largest resident set size of this process so far in bytes, or 0 if unknown."""
+    if _read_memory is not None:
+        try:
+            peak = _read_memory()[1]
+            if peak:
+                return peak
+        except (OSError, ValueError, IndexError):
+            pass
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024 # bytes on macOS, KiB elsewhere
@@ -0,0 +1,101 @@
+"""Local stand-in for the Onshape REST API, for load testing the backend without network access.
+
+Serves the endpoints the dependency engine calls (documents, globaltreenodes/folder, elements,
+currentmicroversion and v12 partstudios features) from the recorded fixtures (see replay_fixtures.py),
+with ETags (answering If-None-Match with 304) and optional injected latency, server errors
+and 429 rate limiting:
+
+    python mock_onshape.py --folder robot --latency 0.05 --jitter 0.02 --error-rate 0.01 --rate-limit-rate 0.05
+
+Then point the backend at it before starting it:
+
+    ONSHAPE_BASE_URL=http://127.0.0.1:5002 python backend_dependency.py
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+
+from flask import Flask, Response, request
+
+from replay_fixtures import ReplayFolder, folder_from_spec
+
+
+def create_app(folder: ReplayFolder, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+               rate_limit_rate: float = 0.0, retry_after: float = 1.0, seed: int = None) -> Flask:
+    """Create the mock Onshape app.
+
+    Args:
+        folder (ReplayFolder): recorded folder to serve.
+        latency (float): seconds added to every response.
+        jitter (float): maximum extra seconds added uniformly at random to every response.
+        error_rate (float): fraction of requests answered with a 500 error.
+        rate_limit_rate (float): fraction of requests answered with a 429 and a Retry-After header.
+        retry_after (float): value of the Retry-After header of 429 responses, in seconds.
+        seed (int, optional): seed of the fault injection, for reproducible runs.
+
+    Returns:
+        Flask: the app; its `stats` attribute counts the requests served by status code.
+    """
+    app = Flask(__name__)
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+    app.stats = {'requests': 0, 'by_status': {}}
+
+    def _count(status: int):
+        with rng_lock:
+            app.stats['requests'] += 1
+            app.stats['by_status'][status] = app.stats['by_status'].get(status, 0) + 1
+
+    @app.route("/api/<path:path>")
+    def onshape_api(path):
+        with rng_lock:
+            delay = latency + rng.uniform(0, jitter)
+            fault = rng.random()
+        if delay:
+            time.sleep(delay)
+        if fault < rate_limit_rate:
+            _count(429)
+            return Response('{"message": "Too many requests"}', status=429, mimetype="application/json",
+                            headers={'Retry-After': "{:g}".format(retry_after)})
+        if fault < rate_limit_rate + error_rate:
+            _count(500)
+            return Response('{"message": "Injected error"}', status=500, mimetype="application/json")
+        try:
+            payload = folder.payload("/api/" + path, request.args.to_dict())
+        except KeyError:
+            _count(404)
+            return Response('{"message": "Not found"}', status=404, mimetype="application/json")
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        response = Response(body, mimetype="application/json")
+        response.set_etag(hashlib.sha1(body).hexdigest()[:20])
+        if request.if_none_match.contains(response.get_etag()[0]):
+            _count(304)
+            return Response(status=304, headers={'ETag': response.headers['ETag']})
+        _count(200)
+        return response
+
+    @app.route("/mock/stats")
+    def mock_stats():
+        return app.stats
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--folder", default="robot", help='"robot", "spray" or "synthetic:<n_features>"')
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="maximum random extra seconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failing with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of requests failing with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After of the 429 responses, in seconds")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the fault injection")
+    parser.add_argument("--port", type=int, default=5002)
+    args = parser.parse_args()
+
+    app = create_app(folder_from_spec(args.folder), args.latency, args.jitter, args.error_rate,
+                     args.rate_limit_rate, args.retry_after, args.seed)
+    app.run(host="127.0.0.1", port=args.port, threaded=True)
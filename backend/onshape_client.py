@@ -0,0 +1,190 @@
+import copy
+import email.utils
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+from etag_cache import ETagCache, request_url
+from rate_limiter import RateLimiter
+
+
+DEFAULT_HEADERS = {
+    "Accept": "application/json;charset=UTF-8; qs=0.09",
+    "Content-Type": "application/json"
+}
+DEFAULT_POOL_SIZE = 16 # keep-alive connections per base URL; should cover the crawl's worker count
+DEFAULT_MAX_RETRIES = 5 # attempts after the first one before a failed response is returned
+BACKOFF_BASE = 0.5 # seconds; the n-th retry waits a random time up to BACKOFF_BASE * 2**n
+BACKOFF_MAX = 30.0
+RETRY_STATUSES = {429, 500, 502, 503, 504} # GETs are idempotent, so these are safe to retry
+RETRY_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) # unreachable, stalled or dropped mid-body
+DEFAULT_TIMEOUT = (10.0, 60.0) # seconds to connect, and between bytes of the response
+
+
+class OnshapeClient:
+    """Thin HTTP client for the Onshape REST API.
+
+    Holds one pooled requests.Session per base URL, so the auth, the default headers
+    and the keep-alive TLS connections are reused across every call of a crawl
+    (and across crawls, if the client is kept around). Every request goes through a shared
+    RateLimiter, and throttled (429), failing (5xx) or dropped requests are retried with
+    exponential backoff and full jitter, honouring Retry-After. Responses with an ETag or a
+    Last-Modified header are revalidated with conditional requests, so unchanged bodies are
+    not downloaded again. Safe to share between threads.
+
+    Args:
+        access (str): Onshape API access key.
+        secret (str): Onshape API secret key.
+        pool_size (int): maximum number of keep-alive connections kept per base URL.
+        transport (BaseAdapter, optional): adapter mounted on every session instead of a pooled
+            HTTPAdapter, e.g. a fake transport that replays recorded responses.
+        limiter (RateLimiter, optional): limiter of the requests; defaults to a new one
+            allowing pool_size requests in flight.
+        max_retries (int): retries of a throttled or failed request before giving up.
+        etags (ETagCache, optional): store of validators and bodies for conditional requests;
+            defaults to a new one. Pass False to always download full bodies.
+        timeout (Tuple[float, float]): connect and read timeouts of every attempt, in seconds.
+    """
+
+    def __init__(self, access: str, secret: str, pool_size: int = DEFAULT_POOL_SIZE, transport: BaseAdapter = None, 
+                 limiter: RateLimiter = None, max_retries: int = DEFAULT_MAX_RETRIES, etags: ETagCache = None, 
+                 timeout: Tuple[float, float] = DEFAULT_TIMEOUT):
+        self.auth = (access, secret)
+        self.pool_size = pool_size
+        self.transport = transport
+        self.limiter = limiter or RateLimiter(max_concurrency=pool_size)
+        self.max_retries = max_retries
+        self.etags = ETagCache() if etags is None else etags or None
+        self.timeout = timeout
+        self.retries = 0 # retried attempts, for monitoring
+        self.recorder = None # FixtureRecorder of a recording view, see recording()
+        self._sessions = {} # Dict[base_url: requests.Session]
+        self._lock = threading.Lock()
+
+    def recording(self, recorder) -> "OnshapeClient":
+        """Get a view of this client that shares its pooled sessions and also hands the body
+        of every successful response to a recorder.
+
+        Args:
+            recorder (FixtureRecorder): recorder of the current request.
+
+        Returns:
+            OnshapeClient: the recording view.
+        """
+        view = copy.copy(self) # shallow: the sessions and their lock are shared
+        view.recorder = recorder
+        return view
+
+    def session(self, base_url: str) -> requests.Session:
+        """Get (or create) the pooled session for a base URL, e.g. "cad.onshape.com". """
+        with self._lock:
+            session = self._sessions.get(base_url)
+            if session is None:
+                session = requests.Session()
+                session.auth = self.auth
+                session.headers.update(DEFAULT_HEADERS)
+                adapter = self.transport or HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[base_url] = session
+            return session
+
+    def get(self, base_url: str, path: str, params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        """Send a GET request to https://{base_url}{path} through the pooled session.
+
+        Args:
+            base_url (str): host of the Onshape stack, e.g. "cad.onshape.com". A base URL with
+                a scheme, e.g. "http://127.0.0.1:5002" for a local mock, is used as is.
+            path (str): API path starting with "/api/".
+            params (Dict[str, Any], optional): query parameters.
+
+        Returns:
+            requests.Response: the raw response, after retries; status checking is left to the caller.
+
+        Raises:
+            requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError: if the last 
+                attempt could not reach the server, stalled or was dropped mid-body. 
+        """
+        root = base_url if "://" in base_url else "https://" + base_url
+        session = self.session(base_url)
+        url = request_url(root + path, params)
+        revalidate = self.etags is not None
+        attempt = 0
+        while True:
+            last_attempt = attempt >= self.max_retries
+            headers = self.etags.validators(url) if revalidate else None
+            response, throttled, retry_after = None, False, None
+            self.limiter.acquire()
+            try:
+                response = session.get(url, headers=headers, timeout=self.timeout)
+                throttled = response.status_code == 429
+                retry_after = _retry_after(response) if throttled or response.status_code == 503 else None
+            except RETRY_ERRORS:
+                if last_attempt:
+                    raise
+            finally: # every acquire is paired with a release, whatever the request raised
+                self.limiter.release(throttled, retry_after or 0.0)
+            if response is None:
+                self._backoff(attempt)
+                attempt += 1
+                continue
+            if response.status_code == 304 and headers:
+                cached = self.etags.revalidated(url, response)
+                if cached is None: # evicted since the request was sent; ask again without validators, outside the retry budget
+                    revalidate = False
+                    continue
+                response = cached
+                break
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                if response.ok and self.etags is not None:
+                    self.etags.store(url, response)
+                break
+            self._backoff(attempt, retry_after)
+            attempt += 1
+        if self.recorder is not None and response.ok:
+            self.recorder.record(_fixture_name(path, params), response.content)
+        return response
+
+    def _backoff(self, attempt: int, retry_after: Optional[float] = None):
+        """Sleep before retrying: the server's Retry-After if given, else exponential backoff with full jitter."""
+        with self._lock:
+            self.retries += 1
+        if retry_after is None:
+            retry_after = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+        time.sleep(retry_after)
+
+    def close(self):
+        """Close every pooled session."""
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            session.close()
+
+
+def _fixture_name(path: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """File name of a recorded response, e.g. "api_documents_d_{did}_w_{wid}_elements_elementType-PARTSTUDIO"."""
+    name = path.strip("/")
+    if params:
+        name += "_" + "_".join("{}-{}".format(key, value) for key, value in sorted(params.items()))
+    return re.sub(r"[^A-Za-z0-9.-]+", "_", name)
+
+
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    """Seconds to wait from the Retry-After header (delay in seconds or HTTP date), if any."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+
+DEFAULT_MAX_CONCURRENCY = 16 # Onshape requests in flight at once, across every crawl sharing the limiter
+MIN_RATE = 1.0 # requests per second never throttled below
+RATE_WINDOW = 2.0 # seconds of recent requests used to estimate the current rate
+MIN_SPAN = 0.25 # seconds; shortest span the rate is estimated over, so a short burst does not look infinitely fast
+
+
+class RateLimiter:
+    """Adaptive limit on the Onshape calls of every thread sharing it.
+
+    Requests are admitted while fewer than `concurrency` are in flight, the token bucket has a
+    token and no Retry-After pause is running. The bucket starts without a rate, so nothing is
+    throttled until Onshape answers 429. Every 429 then halves the concurrency and the rate
+    (starting from the rate observed over the last few seconds) and pauses all requests for the
+    Retry-After delay; every `concurrency` successful requests give back one slot of concurrency
+    and 10% of rate (additive increase, multiplicative decrease). Crawls thus settle just below
+    the highest rate Onshape tolerates. Safe to share between threads.
+
+    Args:
+        max_concurrency (int): upper bound of the requests in flight at once.
+        rate (float, optional): initial requests per second; None for no limit until the first 429.
+        burst (int, optional): size of the token bucket; defaults to max_concurrency.
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, rate: Optional[float] = None, burst: int = None):
+        self.max_concurrency = max_concurrency
+        self.concurrency = max_concurrency
+        self.rate = rate
+        self.burst = burst or max_concurrency
+        self.throttled = 0 # 429 responses seen
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._tokens = float(self.burst)
+        self._refilled = time.monotonic()
+        self._paused_until = 0.0
+        self._successes = 0
+        self._recent = deque() # monotonic start times of the requests of the last RATE_WINDOW seconds
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._paused_until - now
+                if wait <= 0 and self._in_flight >= self.concurrency:
+                    wait = None # until a slot is released
+                elif wait <= 0 and self._tokens < 1:
+                    wait = (1 - self._tokens) / self.rate
+                elif wait <= 0:
+                    break
+                self._cond.wait(wait)
+            self._in_flight += 1
+            if self.rate is not None:
+                self._tokens -= 1
+            self._recent.append(now)
+            while self._recent and self._recent[0] < now - RATE_WINDOW:
+                self._recent.popleft()
+
+    def release(self, throttled: bool = False, retry_after: float = 0.0):
+        """Report the outcome of a request admitted by acquire().
+
+        Args:
+            throttled (bool): the request was answered with 429.
+            retry_after (float): seconds every request should wait before the next attempt.
+        """
+        with self._cond:
+            self._in_flight -= 1
+            now = time.monotonic()
+            if throttled:
+                self.throttled += 1
+                self._successes = 0
+            if throttled and now >= self._paused_until: # 429s of requests sent before the last pause count once
+                self.concurrency = max(1, self.concurrency // 2)
+                span = max(MIN_SPAN, now - self._recent[0]) if self._recent else RATE_WINDOW
+                observed = len(self._recent) / span
+                self.rate = max(MIN_RATE, (self.rate or observed) / 2)
+                self._tokens = min(self._tokens, 0.0) # no burst right after being throttled
+            elif not throttled and (self.rate is not None or self.concurrency < self.max_concurrency):
+                self._successes += 1
+                if self._successes >= self.concurrency:
+                    self._successes = 0
+                    self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+                    if self.rate is not None:
+                        self.rate *= 1.1
+            self._paused_until = max(self._paused_until, now + retry_after)
+            self._cond.notify_all()
+
+    def _refill(self, now: float):
+        # caller holds self._cond
+        if self.rate is not None:
+            self._tokens = min(float(self.burst), self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def info(self) -> Dict[str, float]:
+        with self._cond:
+            return {'concurrency': self.concurrency, 'rate': self.rate, 'throttled': self.throttled, 'in_flight': self._in_flight}
@@ -0,0 +1,152 @@
+"""Recorded Onshape folders rebuilt from the checked-in fixtures, for offline benchmarks and load tests.
+
+- test_output_robot.json / test_output_spray.json give the source master sketches and the
+  document/element layout of their folders,
+- test_features.json (the Claw part studio, which derives the robot master sketches) is
+  replayed for every downstream part studio,
+- test_elements.json is the template of every element listing.
+
+Synthetic folders replicate the Claw part studio until they reach the requested number of features.
+"""
+import json
+import math
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+HERE = Path(__file__).resolve().parent
+
+
+def load_fixture(name: str) -> Any:
+    with open(HERE / name) as f:
+        return json.load(f)
+
+
+class ReplayFolder:
+    """Recorded content of an Onshape folder, served by the fake transport of the benchmarks 
+    and by the mock Onshape server.
+
+    Args:
+        did (str): document ID of the source master sketches.
+        wid (str): workspace ID of the source master sketches.
+        eid (str): element ID of the source master sketches.
+        master_sketches (List[str]): names of the master sketches.
+        docs (List[Tuple[str, str, str]]): (did, wid, name) of every document in the folder.
+        elements (Dict[str, List[Tuple[str, str]]]): Dict[did: List[(eid, name)]] of every part studio.
+        features (Dict[str, Any]): Dict[eid: feature list] of every part studio.
+    """
+
+    def __init__(self, did, wid, eid, master_sketches, docs, elements, features):
+        self.did, self.wid, self.eid = did, wid, eid
+        self.master_sketches = master_sketches
+        self.docs = docs
+        self.elements = elements
+        self.features = {ele_id: json.dumps(payload).encode("utf-8") for ele_id, payload in features.items()}
+        self._element_template = load_fixture("test_elements.json")[0]
+
+    @property
+    def n_features(self) -> int:
+        return sum(len(json.loads(payload)['features']) for payload in self.features.values())
+
+    def payload(self, path: str, query: Dict[str, str]) -> Any:
+        """Answer one of the Onshape endpoints used by the engine.
+
+        Args:
+            path (str): request path, e.g. "/api/documents/d/{did}/w/{wid}/elements".
+            query (Dict[str, str]): query parameters.
+
+        Returns:
+            Any: the JSON payload, or the already encoded body for part studio features.
+
+        Raises:
+            KeyError: if the path is not a known endpoint or resource.
+        """
+        parts = path.strip("/").split("/")
+        if parts[:3] == ["api", "documents", "d"] and parts[-1] == "currentmicroversion":
+            return {'microversion': "m" + parts[3][1:]}
+        if parts[:3] == ["api", "documents", "d"] and parts[-1] == "elements":
+            elements = self.elements[parts[3]]
+            if 'elementId' in query:
+                elements = [ele for ele in elements if ele[0] == query['elementId']]
+            return [dict(self._element_template, id=ele_id, name=name, microversionId="m" + ele_id[1:])
+                    for ele_id, name in elements]
+        if parts[:2] == ["api", "documents"] and len(parts) == 3:
+            return {'id': parts[2], 'parentId': "f0000000000000000000000"}
+        if parts[:3] == ["api", "globaltreenodes", "folder"]:
+            return {'items': [{'resourceType': "document", 'id': did, 'defaultWorkspace': {'id': wid}, 'name': name}
+                              for did, wid, name in self.docs]}
+        if parts[:3] == ["api", "v12", "partstudios"]:
+            return self.features[parts[8]]
+        raise KeyError(path)
+
+
+def folder_from_spec(spec: str) -> ReplayFolder:
+    """Build a folder from "robot", "spray" or "synthetic:<n_features>"."""
+    if spec.startswith("synthetic:"):
+        return synthetic_folder(int(spec.split(":", 1)[1]))
+    return recorded_folder("test_output_{}.json".format(spec))
+
+
+def _source_features(entities_geo: List[Dict[str, Any]], sketches: List[Tuple[str, str]]) -> Dict[str, Any]:
+    """Rebuild the feature list of a master sketch part studio from a recorded result."""
+    features = []
+    for geo_dict, (fid, name) in zip(entities_geo, sketches):
+        entities = []
+        for entity_id, geo in geo_dict.items():
+            geo = dict(geo)
+            is_construction = geo.pop('isConstruction')
+            geo.pop('plane_side', None)
+            geo.pop('featureId', None)
+            if geo['btType'] == 'BTMSketchPoint-158':
+                entities.append({'btType': geo['btType'], 'entityId': entity_id, 'x': geo['x'], 'y': geo['y'], 'isConstruction': is_construction})
+                continue
+            entity = {'btType': 'BTMSketchCurveSegment-155', 'entityId': entity_id, 'isConstruction': is_construction}
+            for key in ('startParam', 'endParam'):
+                if key in geo:
+                    entity[key] = geo.pop(key)
+            entity['geometry'] = geo
+            entities.append(entity)
+        features.append({'btType': 'BTMSketch-151', 'featureType': 'newSketch', 'name': name, 'featureId': fid,
+                         'parameters': [], 'entities': entities})
+    return {'features': features}
+
+
+def _downstream_features(did: str, eid: str) -> Dict[str, Any]:
+    """The Claw part studio, with its derive features pointing at the given source element."""
+    features = load_fixture("test_features.json")
+    for feature in features['features']:
+        for param in feature['parameters']:
+            if param['btType'] == "BTMParameterReferencePartStudio-3302":
+                param['namespace'] = "d{}::e{}".format(did, eid)
+    return features
+
+
+def recorded_folder(output_name: str) -> ReplayFolder:
+    """The folder recorded in a backend/test_output_*.json fixture; every downstream part studio replays test_features.json."""
+    entities_geo, _, doc_info = load_fixture(output_name)[:3]
+    docs = [(did, info['wid'], info['name']) for did, info in doc_info.items()]
+    elements = {did: [(ele_id, ele['name']) for ele_id, ele in info['elements'].items()] for did, info in doc_info.items()}
+    did, wid, _ = docs[0]
+    eid, source = next(iter(doc_info[did]['elements'].items()))
+    sketches = [(fid, feature['name']) for fid, feature in source['features'].items() if feature['featureType'] == 'newSketch']
+    downstream = _downstream_features(did, eid)
+    features = {ele_id: downstream for ele_list in elements.values() for ele_id, _ in ele_list}
+    features[eid] = _source_features(entities_geo, sketches)
+    return ReplayFolder(did, wid, eid, [name for _, name in sketches], docs, elements, features)
+
+
+def synthetic_folder(n_features: int, elements_per_doc: int = 10) -> ReplayFolder:
+    """The robot master sketches with enough copies of the Claw part studio to reach n_features features."""
+    robot = recorded_folder("test_output_robot.json")
+    claw = _downstream_features(robot.did, robot.eid)
+    n_elements = max(1, math.ceil(n_features / len(claw['features'])))
+    docs, elements, features = [robot.docs[0]], {robot.did: [(robot.eid, "Master Sketch")]}, {robot.eid: json.loads(robot.features[robot.eid])}
+    for ele_ind in range(n_elements):
+        doc_ind = ele_ind // elements_per_doc + 1
+        did = "d{:023x}".format(doc_ind)
+        if did not in elements:
+            docs.append((did, "w{:023x}".format(doc_ind), "Synthetic {}".format(doc_ind)))
+            elements[did] = []
+        ele_id = "e{:023x}".format(ele_ind + 1)
+        elements[did].append((ele_id, "Part Studio {}".format(ele_ind)))
+        features[ele_id] = claw
+    return ReplayFolder(robot.did, robot.wid, robot.eid, robot.master_sketches, docs, elements, features)
@@ -0,0 +1,55 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+DEFAULT_MAX_ENTRIES = 64
+DEFAULT_TTL = 300.0 # seconds
+
+
+class ResultCache:
+    """In-memory cache of whole get_dependency results.
+
+    Entries are keyed by the request inputs plus the microversion of the source element, so an
+    edit to the source part studio misses the cache right away. Edits to the downstream part
+    studios do not move that microversion, so every entry also expires ttl seconds after it
+    was stored. The least recently used entries are evicted beyond max_entries. Safe to share
+    between threads.
+
+    Args:
+        max_entries (int): maximum number of results kept in memory.
+        ttl (float): seconds an entry stays valid after it was stored.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict() # Dict[key: (expires_at, value)], least recently used first
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get the cached result for key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        """Store the result for key, evicting the least recently used entries if needed."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def info(self) -> dict:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'max_size': self.max_entries}
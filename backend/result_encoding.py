@@ -0,0 +1,69 @@
+import gzip
+import json
+import threading
+from typing import Any, List
+
+try: # optional, several times faster than the json module on our results
+    import orjson
+except ImportError:
+    orjson = None
+try: # optional, smaller bodies than gzip for browsers that accept "br"
+    import brotli
+except ImportError:
+    brotli = None
+
+from compact_result import encode_compact
+
+
+ENCODINGS = (["br"] if brotli is not None else []) + ["gzip", "identity"] # preferred first
+GZIP_LEVEL = 9 # bodies are cached, so they are compressed once and served many times
+BROTLI_QUALITY = 9
+
+
+def dumps(payload: Any) -> bytes:
+    """Serialize to compact JSON with sorted keys, like Flask's jsonify, with orjson if available."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a body for a Content-Encoding chosen from ENCODINGS."""
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body
+
+
+class EncodedResult:
+    """A get_dependency result together with its serialized bodies.
+
+    Every (format, Content-Encoding) variant is serialized and compressed on first use and then
+    kept, so a result served from the result cache is sent without being encoded again. Safe
+    to share between threads.
+
+    Args:
+        results (List[Any]): [entities_geo, entities_dep, doc_info, mate_connectors, errors].
+        progress (CrawlProgress, optional): final counters of the crawl that computed the results.
+    """
+
+    def __init__(self, results: List[Any], progress=None):
+        self.results = results
+        self.progress = progress
+        self._bodies = {} # Dict[(format, encoding): bytes]
+        self._lock = threading.Lock()
+
+    def body(self, result_format: str = "plain", encoding: str = "identity") -> bytes:
+        """Serialized body in "plain" or "compact" format (see compact_result.py), compressed for encoding."""
+        key = (result_format, encoding)
+        with self._lock:
+            body = self._bodies.get(key)
+        if body is None:
+            if encoding != "identity":
+                body = compress(self.body(result_format), encoding)
+            else:
+                body = dumps(encode_compact(self.results) if result_format == "compact" else self.results)
+            with self._lock:
+                self._bodies[key] = body
+        return body
@@ -0,0 +1,58 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Optional
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one computation.
+
+    The first caller of a key runs the function; callers arriving while it is still running
+    wait for it and share its result (or its exception). The first caller may leave a context
+    next to the call, e.g. its progress, which is handed to the callers that join it. Nothing is
+    kept once the call has finished, so caching the result is left to the caller. Safe to share
+    between threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {} # Dict[key: (Future, context)]
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any], context: Any = None,
+           on_join: Optional[Callable[[Any], None]] = None) -> Any:
+        """Return fn(), or the result of the call already running for key.
+
+        Args:
+            key (Hashable): identity of the computation.
+            fn (Callable[[], Any]): computation to run if none is in flight for key.
+            context (Any, optional): kept next to the call if this caller runs it.
+            on_join (Callable[[Any], None], optional): called with the context of the running
+                call if this caller joins it instead, before waiting for its result.
+
+        Returns:
+            Any: result of fn, possibly computed by another thread.
+        """
+        with self._lock:
+            entry = self._in_flight.get(key)
+            leader = entry is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = (future, context)
+                self.calls += 1
+            else:
+                future, leader_context = entry
+                self.shared += 1
+        if not leader:
+            if on_join is not None:
+                on_join(leader_context)
+            return future.result()
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        return future.result()
@@ -0,0 +1,46 @@
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Hashable, Iterator
+
+
+DEFAULT_MAX_ENTRIES = 32
+
+
+class SnapshotStore:
+    """One snapshot per crawl input, each used by one crawl at a time.
+
+    A DependencySnapshot only helps the next crawl of the same (did, wid, eid, master sketches),
+    and a crawl reads and writes it without locking. The store therefore keeps one snapshot per
+    input key and holds a lock for that key for the whole crawl, so crawls of the same input run
+    one after the other while crawls of different inputs do not wait for each other. The least
+    recently used snapshots are dropped beyond max_entries. Safe to share between threads.
+
+    Args:
+        factory (Callable[[], Any]): creates an empty snapshot, e.g. kc_module.DependencySnapshot.
+        max_entries (int): maximum number of snapshots kept in memory.
+    """
+
+    def __init__(self, factory: Callable[[], Any], max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.factory = factory
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict() # Dict[key: (snapshot, lock)], least recently used first
+
+    @contextmanager
+    def use(self, key: Hashable) -> Iterator[Any]:
+        """Hold the snapshot of key for the duration of a crawl, waiting for any crawl using it."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = (self.factory(), threading.Lock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries: # a crawl still using an evicted snapshot keeps its own reference
+                self._entries.popitem(last=False)
+        snapshot, lock = entry
+        with lock:
+            yield snapshot
+
+    def info(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'max_entries': self.max_entries}
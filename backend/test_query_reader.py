@@ -0,0 +1,147 @@
+import json
+import unittest
+from pathlib import Path
+
+from get_dependency_kc import _QueryReader, _decode_query, _search_ref_entities
+
+
+SKETCH_ID = "F87s6fMQGjxRKDv_1" # featureId of a master sketch
+ENTITY = "wcXEtIidIpvE" # base entityId of one of its entities
+
+
+def _query_string(q_string: str) -> str:
+    # queryString of an uncompressed query, as found in a BTMParameterQueryList-148 parameter
+    return 'query=qCompressed(1.0,"{}",id);'.format(q_string)
+
+
+def _query_param(q_string: str):
+    return {'btType': "BTMParameterQueryList-148", 'queries': [{'queryString': _query_string(q_string)}]}
+
+
+class QueryReaderTest(unittest.TestCase):
+
+    def read(self, q_string: str):
+        reader = _QueryReader(q_string)
+        return reader.references() + (reader.names,)
+
+    def test_id_strings_are_feature_ids(self):
+        feature_ids, entity_bases, _ = self.read("%B2$IdS11.6$F87s6fMQGjxRKDv_1wireOp")
+        self.assertEqual(feature_ids, {SKETCH_ID, "wireOp"})
+        self.assertEqual(entity_bases, set())
+
+    def test_value_strings_are_entity_ids(self):
+        feature_ids, entity_bases, _ = self.read("%A3Sc.6$wcXEtIidIpvEbottomS8$TOPOLOGYS5$EDGES")
+        self.assertEqual(feature_ids, set())
+        self.assertEqual(entity_bases, {ENTITY}) # neither 'TOPOLOGY' nor 'EDGES' has a 12 char base
+
+    def test_map_keys_are_not_references(self):
+        feature_ids, entity_bases, _ = self.read("%M1Sc$abcdefghijklS5$EDGES")
+        self.assertEqual(entity_bases, set())
+
+    def test_name_reference_resolves_string(self):
+        # E0 repeats the map key 'abcdefghijkl' in value position
+        _, entity_bases, names = self.read("%M1Sc$abcdefghijklE0")
+        self.assertEqual(entity_bases, {"abcdefghijkl"})
+        self.assertEqual(names, ["abcdefghijkl"])
+
+    def test_name_reference_index_is_hex(self):
+        strings = "".join("S1${}".format(chr(ord("a") + i)) for i in range(16))
+        _, entity_bases, names = self.read("%A12{}Sc${}E10".format(strings, ENTITY))
+        self.assertEqual(names[16], ENTITY)
+        self.assertEqual(entity_bases, {ENTITY})
+
+    def test_class_reference_reads_instance(self):
+        # C0 is the class 'Id' again, so its string is read as featureIds too
+        feature_ids, entity_bases, names = self.read("%A2B2$IdS6$wireOpC0S11$F87s6fMQGjxRKDv_1")
+        self.assertEqual(feature_ids, {"wireOp", SKETCH_ID})
+        self.assertEqual(names, ["Id", "wireOp", SKETCH_ID])
+
+    def test_class_reference_of_other_class(self):
+        feature_ids, entity_bases, _ = self.read("%A2B5$QueryS1$xC0Sc${}".format(ENTITY))
+        self.assertEqual(feature_ids, set())
+        self.assertEqual(entity_bases, {ENTITY})
+
+    def test_value_reference_is_skipped(self):
+        feature_ids, entity_bases, _ = self.read("%A3Sc${}R0R1a".format(ENTITY))
+        self.assertEqual(entity_bases, {ENTITY})
+
+    def test_multi_part_string_names(self):
+        # every new part is a name of its own, then the whole string
+        _, _, names = self.read("%B2$IdS11.7$F87s6fMQGjxRKDv_1derived")
+        self.assertEqual(names, ["Id", SKETCH_ID, "derived", SKETCH_ID + ".derived"])
+
+    def test_multi_part_string_negative_lengths(self):
+        feature_ids, _, names = self.read("%A2B2$IdS11.7$F87s6fMQGjxRKDv_1derivedC0S-2.-1.5$merge")
+        self.assertEqual(feature_ids, {SKETCH_ID, "derived", "merge"})
+        self.assertEqual(names[4:], ["merge", "derived.{}.merge".format(SKETCH_ID)])
+
+    def test_multi_part_string_negative_hex_index(self):
+        strings = "".join("S1${}".format(chr(ord("a") + i)) for i in range(16))
+        _, entity_bases, names = self.read("%A12{}Sc${}S-10.6$bottom".format(strings, ENTITY))
+        self.assertEqual(names[-2:], ["bottom", ENTITY + ".bottom"])
+        self.assertEqual(entity_bases, {ENTITY})
+
+    def test_malformed(self):
+        for q_string in ("%S20$short", "%B5$QueryX", "%A2S1$a", "%S1$aS1$b", "%M1S1$aE5"):
+            with self.subTest(q_string=q_string):
+                with self.assertRaises(ValueError):
+                    _QueryReader(q_string).references()
+
+
+class DecodeQueryTest(unittest.TestCase):
+
+    def test_parsed(self):
+        q_string = "%B5$QueryM1S8$entitiesA2B2$IdS11$F87s6fMQGjxRKDv_1Sc.6$wcXEtIidIpvEbottom"
+        self.assertEqual(_decode_query(_query_string(q_string)), (q_string, {SKETCH_ID}, {ENTITY}))
+
+    def test_fallback_on_malformed_query(self):
+        # the last string claims 0x20 chars but only 12 follow
+        q_string = "%B5$QueryM1S8$entitiesA2B2$IdS11$F87s6fMQGjxRKDv_1S20$wcXEtIidIpvE"
+        decoded_string, feature_ids, entity_bases = _decode_query(_query_string(q_string))
+        self.assertEqual(decoded_string, q_string)
+        self.assertIsNone(feature_ids)
+        self.assertEqual(entity_bases, {"entitiesA2B2", "F87s6fMQGjxR", ENTITY}) # every 12 char prefix between "$"
+
+    def test_not_a_compressed_query(self):
+        self.assertIsNone(_decode_query("query = qUnion([ qEverything(EntityType.BODY)]);"))
+
+    def test_recorded_queries_parse(self):
+        # every query of the recorded claw part studio is read without the fallback
+        def query_strings(value):
+            if isinstance(value, dict):
+                if 'queryString' in value:
+                    yield value['queryString']
+                for item in value.values():
+                    yield from query_strings(item)
+            elif isinstance(value, list):
+                for item in value:
+                    yield from query_strings(item)
+
+        with open(Path(__file__).resolve().parent / "test_features.json") as f:
+            decoded = [_decode_query(query_string) for query_string in query_strings(json.load(f))]
+        decoded = [query for query in decoded if query is not None]
+        self.assertTrue(decoded)
+        for q_string, feature_ids, _ in decoded:
+            with self.subTest(q_string=q_string[:40]):
+                self.assertIsNotNone(feature_ids)
+
+
+class SearchRefEntitiesTest(unittest.TestCase):
+
+    def test_referenced_through_id(self):
+        params = [_query_param("%B5$QueryM2S8$entitiesSc$wcXEtIidIpvES7$featureB2$IdS11$F87s6fMQGjxRKDv_1")]
+        self.assertEqual(_search_ref_entities(params, [SKETCH_ID]), [ENTITY])
+
+    def test_sketch_id_outside_id_is_not_a_reference(self):
+        params = [_query_param("%B5$QueryM2S8$entitiesSc$wcXEtIidIpvES4$nameS11$F87s6fMQGjxRKDv_1")]
+        self.assertEqual(_search_ref_entities(params, [SKETCH_ID]), [])
+
+    def test_malformed_query_searches_text(self):
+        params = [{'btType': "BTMParameterArray-2025", 'items': [
+            {'parameters': [_query_param("%B5$QueryM1S8$entitiesA2B2$IdS11$F87s6fMQGjxRKDv_1S20$wcXEtIidIpvE")]},
+        ]}]
+        self.assertEqual(sorted(_search_ref_entities(params, [SKETCH_ID])), sorted(["entitiesA2B2", "F87s6fMQGjxR", ENTITY]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,47 @@ import fallbackData from '../backend/test_output_robot.json';
 // Toggle backend vs local JSON. 
 // True for reading from json, false for callin pythong API
 const queryUseLocal = true;
+
+// Rebuilds [entities_geo, entities_dep, doc_info, mate_connectors, ...] from the
+// "compact-v1" encoding of the backend (see backend/compact_result.py).
+export function decodeCompact(compact) {
+  const { strings, schemas } = compact;
+  const entitiesGeo = compact.sketches.map((sketch) => {
+    const bytes = Uint8Array.from(atob(sketch.numbers), (c) => c.charCodeAt(0));
+    const numbers = new Float64Array(bytes.buffer); // little-endian, like every browser
+    let n = 0, b = 0, s = 0, j = 0;
+    const geoDict = {};
+    sketch.ids.forEach((entityIndex, i) => {
+      const geo = {};
+      for (const [key, kind] of schemas[sketch.schemas[i]]) {
+        if (kind === 'n') geo[key] = numbers[n++];
+        else if (kind === 'b') geo[key] = !!sketch.bools[b++];
+        else if (kind === 's') geo[key] = strings[sketch.strings[s++]];
+        else geo[key] = sketch.json[j++];
+      }
+      geoDict[strings[entityIndex]] = geo;
+    });
+    return geoDict;
+  });
+
+  const { features } = compact;
+  const depFeatures = [];
+  for (let i = 0; i < features.length; i += 4) {
+    depFeatures.push(features.slice(i, i + 4).map((index) => strings[index]));
+  }
+  const entitiesDep = {};
+  let r = 0;
+  compact.dep.ids.forEach((entityIndex, i) => {
+    const list = new Array(compact.dep.counts[i]);
+    for (let k = 0; k < list.length; k++) list[k] = depFeatures[compact.dep.refs[r++]];
+    entitiesDep[strings[entityIndex]] = list;
+  });
+
+  return [entitiesGeo, entitiesDep, ...compact.rest];
+}
+
 function normalizeRaw(raw) {
+  if (raw && raw.format === 'compact-v1') raw = decodeCompact(raw);
   const [geoRaw = [], entities_dep = {}, doc_info = {}] = Array.isArray(raw) ? raw : [];
   const sketchGeos = Array.isArray(geoRaw) ? geoRaw : [geoRaw ?? {}];
 
@@ -35,7 +75,7 @@ export async function loadData() {
     return normalizeRaw(fallbackData);
   }
   try {
-    const raw = await callPython();
+    const raw = await callPython((progress) => console.log('[data] crawl progress', progress));
     console.log('[data] backend fetch succeeded');
     return normalizeRaw(raw);
   } catch (err) {
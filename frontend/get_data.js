@@ -1,12 +1,35 @@
 // calls to the python bacnekd.
 const apiBase = "http://127.0.0.1:5001";
+const pollInterval = 500; // ms between progress checks of a crawl job
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
 //make calls to python bacnend
-export async function callPython() {
-    const res = await fetch(`${apiBase}/get_dependency`,{
-        method: "GET",
+// starts the crawl as a background job, polls its progress and fetches the result once done,
+// so a big folder never holds one HTTP request open for the whole crawl.
+// onProgress (optional) gets the counters {documents, documents_total, elements, elements_total, features}
+export async function callPython(onProgress) {
+    const start = await fetch(`${apiBase}/jobs`,{
+        method: "POST",
         headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({}),
     });
+    if (!start.ok) throw new Error(`HTTP ${start.status}`);
+    const { job_id } = await start.json();
+
+    while (true) {
+        const res = await fetch(`${apiBase}/jobs/${job_id}`);
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        const job = await res.json();
+        if (onProgress) onProgress(job.progress);
+        if (job.status === "failed") throw new Error(`crawl failed: ${job.error}`);
+        if (job.status === "done") break;
+        await sleep(pollInterval);
+    }
+
+    const res = await fetch(`${apiBase}/jobs/${job_id}/result?format=compact`);
     if (!res.ok) throw new Error(`HTTP ${res.status}`);
     console.log("ok it finally works");
-    return res.json();
-}
\ No newline at end of file
+    return res.json(); // compact-v1, decoded by normalizeRaw
+}
+